@@ -1,4 +1,13 @@
 __version__ = "1.0.3"
-from napari_data_inspection.data_inspection._widget import DataInspectionWidget
 
 __all__ = ("DataInspectionWidget",)
+
+
+def __getattr__(name):
+    # imported on first use, so worker processes (e.g. snapshot rendering) and headless tools
+    # importing submodules do not pull in napari and Qt
+    if name == "DataInspectionWidget":
+        from napari_data_inspection.data_inspection._widget import DataInspectionWidget
+
+        return DataInspectionWidget
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
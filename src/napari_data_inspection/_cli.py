@@ -1,9 +1,27 @@
 import argparse
+import os
 from pathlib import Path
 
 import napari
+from napari.components import ViewerModel
+from omegaconf import OmegaConf
+from qtpy.QtWidgets import QApplication
+from vidata import LOADER_REGISTRY
+from vidata.config_manager import ConfigManager
 
 from napari_data_inspection import DataInspectionWidget
+from napari_data_inspection.data_inspection._profiling import (
+    compare_summaries,
+    load_trace,
+    replay_trace,
+    summarize,
+)
+from napari_data_inspection.data_inspection._snapshot import render_snapshots
+from napari_data_inspection.widgets.layers_block_widget import (
+    AUTO_BACKEND,
+    REGISTRY_MAPPING,
+    scan_files,
+)
 
 
 def main():
@@ -11,13 +29,62 @@ def main():
     parser.add_argument("-c", "--config", type=Path, default=None, help="Path to YAML config file")
     parser.add_argument("-s", "--split", choices=["train", "val", "test"], default=None)
     parser.add_argument("-f", "--fold", type=int, default=None)
+    parser.add_argument(
+        "--shared-cache",
+        type=float,
+        nargs="?",
+        const=8,
+        default=None,
+        metavar="GB",
+        help="Share decoded files with other viewers on this machine (cache size in GB)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        nargs="?",
+        const=Path(),
+        default=None,
+        metavar="TRACE",
+        help="Record the navigation session and write the trace on exit",
+    )
+    parser.add_argument("--profile-cpu", action="store_true", help="Also run cProfile")
+    parser.add_argument("--profile-memory", action="store_true", help="Also run tracemalloc")
+    parser.add_argument(
+        "--replay", type=Path, default=None, metavar="TRACE", help="Replay a trace headless"
+    )
+    parser.add_argument(
+        "--no-realtime", action="store_true", help="Replay without the recorded pauses"
+    )
+    parser.add_argument(
+        "--snapshots",
+        type=Path,
+        default=None,
+        metavar="OUT_DIR",
+        help="Render a PNG snapshot of every case of --config headless and exit",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Processes for --snapshots")
+    parser.add_argument(
+        "--memory-budget", type=float, default=None, metavar="GB", help="For --snapshots"
+    )
     args = parser.parse_args()
     config_path = args.config
 
+    if args.replay is not None:
+        replay(args)
+        return
+    if args.snapshots is not None:
+        snapshots(args)
+        return
+
     viewer = napari.Viewer()
     widget = DataInspectionWidget(viewer)
+    if args.shared_cache is not None:
+        widget.enable_shared_cache(True, int(args.shared_cache * 1024**3))
     if config_path is not None:
         widget._load_yaml_cfg(args.config, split=args.split, fold=args.fold)
+    recorder = None
+    if args.profile is not None:
+        recorder = widget.start_profiling(args.profile_cpu, args.profile_memory)
 
     viewer.window.add_dock_widget(
         widget,
@@ -29,6 +96,109 @@ def main():
 
     napari.run()
 
+    if recorder is not None and widget.recorder is recorder:
+        # the widget may already be deleted, dump directly
+        widget.recorder = None
+        path = _trace_path(args.profile, widget)
+        print(f"Profiling trace written to {recorder.dump(path)}")
+
+
+def _trace_path(path, widget):
+    if path == Path() or path.is_dir():
+        name = getattr(widget.project_path, "stem", None) or "data_inspection"
+        return path / f"{name}.trace.json"
+    return path
+
+
+def replay(args):
+    """Replay a recorded trace headless and compare the timings.
+
+    The widget drives a bare ViewerModel, nothing is drawn so no OpenGL context is needed.
+    """
+    # the widgets still need a QApplication, the offscreen platform needs no display either
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    trace = load_trace(args.replay)
+    widget = DataInspectionWidget(ViewerModel())
+    if args.config is not None:
+        widget._load_yaml_cfg(args.config, split=args.split, fold=args.fold)
+    else:
+        widget.load_config(OmegaConf.create(trace["project"]))
+    output = None if args.profile is None else _trace_path(args.profile, widget)
+    events = replay_trace(
+        widget,
+        trace,
+        realtime=not args.no_realtime,
+        process_events=app.processEvents,
+        output=output,
+        profile_cpu=args.profile_cpu,
+        trace_memory=args.profile_memory,
+    )
+    print(compare_summaries(trace.get("summary") or summarize(trace["events"]), summarize(events)))
+    widget.close()
+
+
+def snapshot_cases(config, split=None, fold=None):
+    """Cases of a project config for render_snapshots, without creating any widget."""
+    data_inspection_config = config.get("data_inspection", None) or {}
+    exclude_layers = data_inspection_config.get("exclude_layers", [])
+    exclude_layers = exclude_layers if isinstance(exclude_layers, list) else [exclude_layers]
+
+    layers = []
+    for layer in ConfigManager(config, strict=False).layers:
+        if layer.name in exclude_layers:
+            continue
+        cfg = layer.config(split=split, fold=fold)
+        ltype = "Labels" if cfg["type"].lower() in ("labels", "semseg") else "Image"
+        target = REGISTRY_MAPPING[ltype]
+        backend = cfg.get("backend")
+        if backend in (None, AUTO_BACKEND):
+            backend = (cfg.get("auto_backend") or {}).get("backend")
+            backend = backend or next(iter(LOADER_REGISTRY[target][cfg["file_type"]]))
+        fm = scan_files(
+            path=cfg["path"],
+            file_type=cfg["file_type"],
+            pattern=cfg.get("pattern"),
+            include_names=cfg.get("include_names"),
+        )
+        layers.append((cfg["name"], fm, target, cfg["file_type"], backend))
+
+    # layers without files are skipped, like the widget does
+    layers = [layer for layer in layers if len(layer[1])]
+    num_cases = min((len(fm) for _, fm, *_ in layers), default=0)
+    return [
+        (
+            index,
+            _case_name(layers, index),
+            [(name, str(fm[index]), *loader) for name, fm, *loader in layers],
+        )
+        for index in range(num_cases)
+    ]
+
+
+def _case_name(layers, index):
+    """Name of the file of the first layer that has one at index, see the widget's case_name."""
+    for _, fm, *_ in layers:
+        if index < len(fm):
+            return fm.name_from_path(fm[index], False)
+    return str(index)
+
+
+def snapshots(args):
+    """Render snapshots of every case of the project headless."""
+    if args.config is None:
+        raise SystemExit("--snapshots needs a project --config")
+    cases = snapshot_cases(OmegaConf.load(args.config), split=args.split, fold=args.fold)
+    memory_budget = None if args.memory_budget is None else int(args.memory_budget * 1024**3)
+    paths, sheet = render_snapshots(
+        cases,
+        args.snapshots,
+        max_workers=args.workers,
+        memory_budget=memory_budget,
+        progress=lambda done, total: print(f"\rRendered {done} / {total} cases", end=""),
+    )
+    print(f"\n{len(paths)} snapshots written to {args.snapshots}, contact sheet: {sheet}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,61 @@
+from collections.abc import Callable
+from time import perf_counter
+
+import numpy as np
+
+
+def _materialize(data):
+    # lazy backends (e.g. blosc2) only decode on access, time the full decode for a fair comparison
+    return data if isinstance(data, np.ndarray) else np.asarray(data[...])
+
+
+def benchmark_backends(
+    loaders: dict[str, Callable],
+    files: list,
+    sample_size: int = 3,
+) -> tuple[str | None, dict[str, float | None]]:
+    """Time the candidate loaders on a sample of files and return the fastest one.
+
+    Outputs of every loader are checked against the first working loader on the first sampled
+    file, loaders producing different shapes or values are not eligible. That first load is not
+    timed, so every backend is measured with a warm file system cache.
+
+    Args:
+        loaders (dict): Backend name -> loader function from the vidata LOADER_REGISTRY.
+        files (list): Files of the layer, a sample spread over the whole list is used.
+        sample_size (int): Number of files to load with every loader.
+
+    Returns:
+        tuple: (fastest backend or None, backend -> mean load time in seconds or None if the
+        backend failed or is not equivalent).
+    """
+    if len(files) == 0 or len(loaders) == 0:
+        return None, {}
+    sample = np.unique(np.linspace(0, len(files) - 1, min(sample_size, len(files))).astype(int))
+    sample = [files[i] for i in sample]
+
+    timings = {}
+    reference = None
+    for backend, loader in loaders.items():
+        try:
+            # untimed first load: equivalence check and warm file cache for every backend alike
+            data = _materialize(loader(sample[0])[0])
+            if reference is None:
+                reference = data
+            elif data.shape != reference.shape or not np.allclose(data, reference, equal_nan=True):
+                raise ValueError("output differs from the other backends")
+            del data
+
+            durations = []
+            for file in sample:
+                start = perf_counter()
+                _materialize(loader(file)[0])
+                durations.append(perf_counter() - start)
+            timings[backend] = float(np.mean(durations))
+        except Exception as e:  # noqa: BLE001
+            print(f"Backend {backend} is not eligible: {e}")
+            timings[backend] = None
+
+    valid = {k: v for k, v in timings.items() if v is not None}
+    best = min(valid, key=valid.get) if valid else None
+    return best, timings
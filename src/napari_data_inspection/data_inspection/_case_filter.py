@@ -0,0 +1,155 @@
+import builtins
+import json
+import types
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from napari_data_inspection.data_inspection._label_stats import class_counts
+
+# names available in filter expressions which need the voxel data of a case
+DECODE_FIELDS = {"classes", "min_value", "max_value"}
+# names which only need the file header
+HEADER_FIELDS = {"shape"}
+
+_SAFE_BUILTINS = {
+    name: getattr(builtins, name)
+    for name in ["abs", "all", "any", "len", "max", "min", "set", "sorted", "sum"]
+}
+
+
+def labels_classes(data) -> list[int]:
+    return sorted(class_counts(data))
+
+
+def file_metadata(data, labels: bool) -> dict:
+    """Metadata of one decoded file used by filter expressions."""
+    data = np.asarray(data)
+    meta = {"shape": tuple(data.shape)}
+    if labels:
+        meta["classes"] = labels_classes(data)
+    elif data.size:
+        meta["min_value"] = float(np.nanmin(data))
+        meta["max_value"] = float(np.nanmax(data))
+    return meta
+
+
+def compile_filter(expression: str):
+    """Compile a filter expression, raises ValueError for invalid expressions.
+
+    Expressions are plain python evaluated per case, e.g. ``3 in classes``,
+    ``'bad' in flags and shape[0] > 100`` or ``max_value > 1000``. Available names are
+    index, name, classes, shape, min_value, max_value, flags, mismatch and layers.
+    """
+    try:
+        code = compile(expression, "<filter>", "eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter '{expression}': {e.msg}") from e
+    if any(name.startswith("__") for name in _names(code)):
+        raise ValueError(f"Invalid filter '{expression}'")
+    return code
+
+
+def _names(code) -> set[str]:
+    """Global and attribute names used by code, including nested generators/comprehensions."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _names(const)
+    return names
+
+
+def required_fields(code) -> set[str]:
+    return _names(code)
+
+
+def case_namespace(index, name, layers, flags=(), mismatch=False) -> dict:
+    """Names a filter expression is evaluated with, layers maps layer name -> file metadata."""
+    classes = set()
+    min_values, max_values = [], []
+    shape = None
+    for meta in layers.values():
+        classes.update(meta.get("classes", []))
+        if "min_value" in meta:
+            min_values.append(meta["min_value"])
+            max_values.append(meta["max_value"])
+        if shape is None and "shape" in meta:
+            shape = tuple(meta["shape"])
+    return {
+        "index": index,
+        "name": name,
+        "classes": classes,
+        "shape": shape,
+        "min_value": min(min_values) if min_values else None,
+        "max_value": max(max_values) if max_values else None,
+        "flags": set(flags),
+        "mismatch": mismatch,
+        "layers": layers,
+    }
+
+
+def evaluate_filter(code, namespace: dict) -> bool:
+    try:
+        # as globals, generators and comprehensions do not see the locals of eval
+        namespace = {**namespace, "__builtins__": _SAFE_BUILTINS}
+        return bool(eval(code, namespace))  # noqa: S307
+    except Exception:  # noqa: BLE001
+        # e.g. comparing None for cases without the required metadata
+        return False
+
+
+class ReviewLog:
+    """Append-only JSON lines log of QC flags, flags are keyed by case name.
+
+    Every line is one event ``{"time", "session", "index", "name", "flag", "action"}`` with
+    action ``add`` or ``remove``. The current flags are obtained by replaying the log.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.session = datetime.now().isoformat(timespec="seconds")
+        self._flags = None
+
+    def _append(self, entry):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def _event(self, index, name, flag, action):
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "session": self.session,
+            "index": int(index),
+            "name": name,
+            "flag": flag,
+            "action": action,
+        }
+        flags = self.flags()
+        self._append(entry)
+        if action == "add":
+            flags.setdefault(name, set()).add(flag)
+        else:
+            flags.get(name, set()).discard(flag)
+
+    def add(self, index, name, flag):
+        self._event(index, name, flag, "add")
+
+    def remove(self, index, name, flag):
+        self._event(index, name, flag, "remove")
+
+    def flags(self) -> dict[str, set[str]]:
+        if self._flags is None:
+            self._flags = {}
+            if self.path.is_file():
+                with open(self.path) as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        entry = json.loads(line)
+                        flags = self._flags.setdefault(entry["name"], set())
+                        if entry.get("action", "add") == "add":
+                            flags.add(entry["flag"])
+                        else:
+                            flags.discard(entry["flag"])
+        return self._flags
@@ -0,0 +1,179 @@
+"""Compact file lists for layers with very many files.
+
+A `FileTable` keeps a common root plus the relative names of all files packed into one bytes
+buffer (names separated by a NUL byte) and a numpy array with the start offset of every name.
+For a million files this is a few ten MB instead of a list of a million `Path` objects, and
+substring search runs over the buffer in C instead of over Python strings.
+"""
+
+import fnmatch
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from natsort import natsorted
+
+SEPARATOR = b"\0"
+
+
+def _relative(path, root):
+    """path relative to root, unchanged if it is not below root."""
+    if not root:
+        return path
+    # the prefix ends with a separator, so neither "/" nor siblings like /data vs /database break
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    return path[len(prefix) :] if path.startswith(prefix) else path
+
+
+def _common_root(paths):
+    if not paths:
+        return ""
+    if len(paths) == 1:
+        return os.path.dirname(paths[0])
+    return os.path.commonpath(paths)
+
+
+def list_files(path, file_type, pattern=None, include_names=None, recursive=False):
+    """(root, relative names) of the files a vidata FileManager would collect.
+
+    The listing works on the names as strings, no Path object is created per file. path is a
+    directory or a .json file listing the files, pattern is a glob like "*_image" and
+    include_names keeps the files whose name without file_type is one of them.
+    """
+    path = str(path)
+    if file_type == "" or path == "":
+        return "", []
+    if path.endswith(".json"):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        with open(path) as f:
+            paths = [str(p) for p in json.load(f)]
+        if include_names is not None:
+            # names of listed files are their full paths, as for the FileManager
+            include = set(include_names)
+            paths = [p for p in paths if Path(p).as_posix().removesuffix(file_type) in include]
+        root = os.path.normpath(_common_root(paths)) if paths else ""
+        names = [_relative(p, root) for p in paths]
+        if os.sep != "/":
+            names = [n.replace(os.sep, "/") for n in names]
+        return root, names
+
+    if pattern is None:
+        pattern = "*"
+    elif "*" not in pattern:
+        pattern = "*" + pattern
+    pattern += file_type
+    if recursive:
+        names = []
+        for directory, _, files in os.walk(path):
+            prefix = os.path.relpath(directory, path).replace(os.sep, "/")
+            prefix = "" if prefix == "." else prefix + "/"
+            names.extend(prefix + file for file in fnmatch.filter(files, pattern))
+    else:
+        with os.scandir(path) as entries:
+            names = fnmatch.filter((e.name for e in entries if e.is_file()), pattern)
+    if include_names is not None:
+        include = set(include_names)
+        names = [name for name in names if name.removesuffix(file_type) in include]
+    return os.path.normpath(path), natsorted(names)
+
+
+class FileTable:
+    """Immutable, indexable list of files, a drop-in for the vidata FileManager lookups.
+
+    Args:
+        root (str): Common root of all files.
+        names (list): Relative names (posix, with file extension) in the order of the files.
+        file_type (str): File extension, stripped by `name(..., include_ext=False)`.
+    """
+
+    def __init__(self, root="", names=(), file_type=""):
+        self.root = str(root)
+        self.file_type = file_type
+        names = list(names)
+        # paths never contain NUL, so matches can not span two names
+        self._buffer = ("\0".join(names) + "\0").encode("utf-8") if names else b""
+        ends = np.flatnonzero(np.frombuffer(self._buffer, np.uint8) == 0)
+        # start of name i is offsets[i], it ends one byte before offsets[i + 1]
+        self._offsets = np.concatenate([[0], ends + 1]).astype(np.int64)
+
+    @classmethod
+    def from_paths(cls, paths, root=None, file_type=""):
+        """Table of absolute paths, root defaults to their common directory."""
+        paths = [str(p) for p in paths]
+        if root is None:
+            root = _common_root(paths)
+        root = os.path.normpath(root) if root else ""
+        names = [_relative(p, root) for p in paths]
+        if os.sep != "/":
+            names = [n.replace(os.sep, "/") for n in names]
+        return cls(root, names, file_type)
+
+    @classmethod
+    def from_file_manager(cls, fm):
+        """Pack the files of a vidata FileManager, its root is kept unless it lists a .json."""
+        root = None if fm.path.suffix == ".json" or str(fm.path) in ("", ".") else fm.path
+        return cls.from_paths(fm.files, root, fm.file_type)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, item):
+        name = self.name(item)
+        return Path(self.root, name) if self.root else Path(name)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def files(self):
+        return self
+
+    @property
+    def nbytes(self):
+        return len(self._buffer) + self._offsets.nbytes
+
+    def name(self, index, include_ext=True) -> str:
+        """Relative name of file index, O(1)."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        name = self._buffer[self._offsets[index] : self._offsets[index + 1] - 1].decode("utf-8")
+        if not include_ext and self.file_type and name.endswith(self.file_type):
+            name = name[: -len(self.file_type)]
+        return name
+
+    def name_from_path(self, file, include_ext=True) -> str:
+        """Relative name of a file given by index or path, like FileManager.name_from_path."""
+        if isinstance(file, (int, np.integer)):
+            return self.name(int(file), include_ext)
+        name = _relative(str(file), self.root).replace(os.sep, "/")
+        if not include_ext and self.file_type and name.endswith(self.file_type):
+            name = name[: -len(self.file_type)]
+        return name
+
+    def names(self, include_ext=True) -> list[str]:
+        """All relative names, decoded in one go."""
+        if not len(self):
+            return []
+        names = self._buffer[:-1].decode("utf-8").split("\0")
+        if not include_ext and self.file_type:
+            n = len(self.file_type)
+            names = [name[:-n] if name.endswith(self.file_type) else name for name in names]
+        return names
+
+    def search(self, query, limit=None) -> list[int]:
+        """Indices of the files whose relative name contains query, in order."""
+        needle = query.encode("utf-8")
+        if not len(self) or SEPARATOR in needle:
+            return []
+        matches = []
+        position = self._buffer.find(needle)
+        while position != -1 and (limit is None or len(matches) < limit):
+            index = int(np.searchsorted(self._offsets, position, side="right")) - 1
+            matches.append(index)
+            # continue with the next name, one match per file is enough
+            position = self._buffer.find(needle, self._offsets[index + 1])
+        return matches
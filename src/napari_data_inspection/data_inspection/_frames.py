@@ -0,0 +1,183 @@
+"""Lazy frame access for 4D (time or channel stacks) files.
+
+Instead of decoding a whole series, `LazyFrameArray` reads single frames (the first axis) on
+demand when napari slices it, keeps the most recently used frames and prefetches the next
+frames in the direction of playback.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from napari_data_inspection.data_inspection._header_io import read_header
+
+FRAME_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="frames")
+
+# backends which can read a single frame without decoding the whole file
+FRAME_BACKENDS = {"numpy", "tifffile", "blosc2", "blosc2pkl"}
+
+
+class LazyFrameArray:
+    """Array-like over the frames of a series, for napari layers.
+
+    Args:
+        read_frame (callable): frame index -> numpy array of shape[1:].
+        shape (tuple): Shape of the whole series.
+        dtype: Data type.
+        cache_frames (int): Number of decoded frames to keep.
+        window (int): Frames to prefetch ahead of the current one (and one behind).
+        executor: Executor the frames are prefetched on.
+        close (callable, optional): Releases the file behind read_frame, called by `close()` or
+            once the array is garbage collected.
+    """
+
+    def __init__(
+        self, read_frame, shape, dtype, cache_frames=16, window=2, executor=None, close=None
+    ):
+        self._read_frame = read_frame
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.window = window
+        self.cache_frames = max(cache_frames, 2 * window + 2)
+        self._executor = FRAME_EXECUTOR if executor is None else executor
+        self._lock = threading.Lock()
+        self._frames = OrderedDict()
+        self._pending = {}
+        self._last = None
+        # close must not reference the array, otherwise it would never be collected
+        self._finalizer = weakref.finalize(self, close) if close is not None else None
+
+    def close(self):
+        """Release the file, the array can not read frames afterwards."""
+        if self._finalizer is not None:
+            self._finalizer()
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        # only the decoded frames are held in memory
+        with self._lock:
+            return sum(f.nbytes for f in self._frames.values())
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _store(self, t, frame):
+        with self._lock:
+            self._frames[t] = frame
+            self._frames.move_to_end(t)
+            self._pending.pop(t, None)
+            while len(self._frames) > self.cache_frames:
+                self._frames.popitem(last=False)
+
+    def _load(self, t):
+        frame = np.asarray(self._read_frame(t))
+        self._store(t, frame)
+        return frame
+
+    def frame(self, t):
+        """Frame t, from the cache, an in-flight prefetch or read now."""
+        t = int(t) % self.shape[0] if t < 0 else int(t)
+        with self._lock:
+            frame = self._frames.get(t)
+            if frame is not None:
+                self._frames.move_to_end(t)
+            future = self._pending.get(t)
+        if frame is None:
+            frame = future.result() if future is not None else self._load(t)
+        self._prefetch(t)
+        return frame
+
+    def _prefetch(self, t):
+        direction = -1 if self._last is not None and t < self._last else 1
+        self._last = t
+        wanted = [t + direction * i for i in range(1, self.window + 1)] + [t - direction]
+        with self._lock:
+            for i in wanted:
+                if 0 <= i < self.shape[0] and i not in self._frames and i not in self._pending:
+                    self._pending[i] = self._executor.submit(self._load, i)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1 :]
+        if not key:
+            key = (slice(None),)
+        first, rest = key[0], key[1:]
+        if isinstance(first, (int, np.integer)):
+            return self.frame(first)[rest]
+        frames = np.arange(self.shape[0])[first]
+        return np.stack([self.frame(t) for t in np.atleast_1d(frames)])[(slice(None), *rest)]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self[:], dtype=dtype)
+
+
+def _frame_reader(file, backend, loader, shape):
+    """(read_frame, meta, close) for a backend in FRAME_BACKENDS, close may be None."""
+    if backend == "numpy":
+        data = np.load(file, mmap_mode="r")
+        return lambda t: np.array(data[t]), {}, None
+    if backend == "tifffile":
+        import tifffile
+
+        tif = tifffile.TiffFile(file)
+        lock = threading.Lock()
+        try:
+            page_size = int(np.prod(tif.pages[0].shape))
+        except Exception:
+            tif.close()
+            raise
+        pages_per_frame = int(np.prod(shape[1:])) // page_size
+
+        def read_frame(t):
+            # TiffFile reads through one file handle, serialize the readers
+            with lock:
+                pages = range(t * pages_per_frame, (t + 1) * pages_per_frame)
+                return tif.asarray(key=pages).reshape(shape[1:])
+
+        def close():
+            # not while a prefetch is still reading
+            with lock:
+                tif.close()
+
+        return read_frame, {}, close
+    # blosc2 loaders return a lazy array, slicing decodes only the chunks of the frame
+    data, meta = loader(file)
+    return lambda t: np.asarray(data[t]), meta, None
+
+
+def open_frames(file, backend, loader, cache_frames=16, window=2):
+    """Open a 4D file for streaming, returns (LazyFrameArray, meta) or None if not possible."""
+    if backend not in FRAME_BACKENDS:
+        return None
+    header = read_header(str(file), backend)
+    if header is None:
+        return None
+    shape = tuple(header["shape"])
+    if len(shape) < 4:
+        return None
+    read_frame, meta, close = _frame_reader(str(file), backend, loader, shape)
+    affine = meta.get("affine", header.get("affine"))
+    if affine is not None:
+        affine = np.asarray(affine, dtype=float)
+        if affine.shape[0] < len(shape) + 1:
+            # spatial affine only, the frame axis is not transformed
+            full = np.eye(len(shape) + 1)
+            n = affine.shape[0]
+            full[-n:, -n:] = affine
+            affine = full
+    array = LazyFrameArray(read_frame, shape, header["dtype"], cache_frames, window, close=close)
+    return array, {**meta, "affine": affine}
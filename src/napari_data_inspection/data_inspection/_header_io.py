@@ -0,0 +1,325 @@
+import zipfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from vidata.utils.affine import build_affine
+
+# backend -> function returning {"shape": tuple, "dtype": np.dtype, "affine": np.ndarray | None}
+# or None if the file has no header the data can be described by
+HEADER_REGISTRY: dict[str, Callable[..., dict[str, Any] | None]] = {}
+
+
+def register_header_reader(*backends: str) -> Callable:
+    """Register a header-only reader for the given loader backends (same names as vidata)."""
+
+    def decorator(func: Callable) -> Callable:
+        for backend in backends:
+            HEADER_REGISTRY[backend] = func
+        return func
+
+    return decorator
+
+
+def read_header(file, backend: str) -> dict[str, Any] | None:
+    """Read shape, dtype and affine of a file without reading the voxel data.
+
+    The affine follows the conventions of the corresponding vidata loader (numpy axis order,
+    LPS world coordinates), so headers of different backends are comparable. Returns None if
+    the header is unknown, i.e. no reader is registered for the backend or the file has no
+    single array header.
+    """
+    if backend not in HEADER_REGISTRY:
+        return None
+    return HEADER_REGISTRY[backend](str(file))
+
+
+def _sitk_affine(ndims, spacing, origin, direction):
+    # sitk is (x, y, z) ordered, vidata returns everything in numpy (z, y, x) order
+    P = np.arange(ndims)[::-1]
+    direction = np.asarray(direction, dtype=float).reshape(ndims, ndims)[np.ix_(P, P)]
+    spacing = np.asarray(spacing, dtype=float)[P]
+    origin = np.asarray(origin, dtype=float)[P]
+    return build_affine(ndims, spacing, origin, direction)
+
+
+@register_header_reader("sitk")
+def read_header_sitk(file: str) -> dict[str, Any]:
+    import SimpleITK as sitk
+
+    reader = sitk.ImageFileReader()
+    reader.SetFileName(file)
+    reader.ReadImageInformation()
+    ndims = reader.GetDimension()
+    shape = tuple(reader.GetSize())[::-1]
+    if reader.GetNumberOfComponents() > 1:
+        shape = (*shape, reader.GetNumberOfComponents())
+    # sitk has no pixel id -> numpy dtype table, so ask a single voxel image
+    dtype = sitk.GetArrayViewFromImage(sitk.Image([1] * ndims, reader.GetPixelID())).dtype
+    affine = _sitk_affine(ndims, reader.GetSpacing(), reader.GetOrigin(), reader.GetDirection())
+    return {"shape": shape, "dtype": dtype, "affine": affine}
+
+
+def _nib_to_sitk(affine, ndim):
+    # same conversion as vidata.io.nib_io.load_nib: RAS+ (x, y, z) -> LPS (z, y, x)
+    P = np.eye(ndim)[::-1]
+    affine = np.diag([-1.0, -1.0, 1.0, 1.0]) @ affine
+    affine_sitk = np.eye(ndim + 1)
+    affine_sitk[:ndim, :ndim] = P @ affine[:ndim, :ndim] @ P.T
+    affine_sitk[:ndim, ndim] = P @ affine[:ndim, 3]
+    return affine_sitk
+
+
+@register_header_reader("nibabel")
+def read_header_nibabel(file: str) -> dict[str, Any]:
+    import nibabel as nib
+
+    image = nib.load(file)  # only parses the header, the voxel data is a lazy proxy
+    shape = image.header.get_data_shape()
+    ndim = len(shape)
+    return {
+        "shape": tuple(shape)[::-1],
+        # vidata loads through get_fdata, which always returns float64
+        "dtype": np.dtype(np.float64),
+        "affine": _nib_to_sitk(image.affine, ndim) if ndim in (2, 3) else None,
+    }
+
+
+@register_header_reader("nibabelRO")
+def read_header_nibabel_ro(file: str) -> dict[str, Any]:
+    import nibabel as nib
+    from nibabel.orientations import inv_ornt_aff, io_orientation
+
+    image = nib.load(file)
+    shape = image.header.get_data_shape()
+    ndim = len(shape)
+    # reorientation without touching the data, see nibabel's SpatialImage.as_reoriented
+    ornt = io_orientation(image.affine)
+    affine = image.affine @ inv_ornt_aff(ornt, shape)
+    reoriented = list(shape)
+    for axis, new_axis in enumerate(ornt[:, 0]):
+        reoriented[int(new_axis)] = shape[axis]
+    shape = tuple(reoriented)
+    return {
+        "shape": shape[::-1],
+        "dtype": np.dtype(np.float64),
+        "affine": _nib_to_sitk(affine, ndim) if ndim in (2, 3) else None,
+    }
+
+
+_NRRD_TYPE_NAMES = {
+    "int8": ["signed char", "int8", "int8_t"],
+    "uint8": ["uchar", "unsigned char", "uint8", "uint8_t"],
+    "int16": ["short", "short int", "signed short", "signed short int", "int16", "int16_t"],
+    "uint16": ["ushort", "unsigned short", "unsigned short int", "uint16", "uint16_t"],
+    "int32": ["int", "signed int", "int32", "int32_t"],
+    "uint32": ["uint", "unsigned int", "uint32", "uint32_t"],
+    "int64": ["longlong", "long long", "long long int", "signed long long", "int64", "int64_t"],
+    "uint64": ["ulonglong", "unsigned long long", "unsigned long long int", "uint64", "uint64_t"],
+    "float32": ["float"],
+    "float64": ["double"],
+}
+NRRD_DTYPES = {n: np.dtype(dtype) for dtype, names in _NRRD_TYPE_NAMES.items() for n in names}
+
+
+@register_header_reader("nrrd")
+def read_header_nrrd(file: str) -> dict[str, Any]:
+    import nrrd
+
+    header = nrrd.read_header(file)
+    shape = tuple(int(s) for s in header["sizes"])
+    ndims = len(shape)
+    # same conventions as vidata.io.nrrd_io.load_nrrd
+    origin = np.array(header["space origin"]) if "space origin" in header else np.zeros(ndims)
+    if "space directions" in header:
+        directions = np.asarray(header["space directions"], dtype=float)
+        spacing = np.linalg.norm(directions, axis=1)
+        direction = (directions / (spacing[:, None] + 1e-12)).T.flatten()
+    else:
+        spacing = np.ones(ndims)
+        direction = np.eye(ndims).flatten()
+    affine = build_affine(
+        ndims, spacing[::-1], origin[::-1], np.array(direction[::-1]).reshape(ndims, ndims)
+    )
+    return {"shape": shape[::-1], "dtype": NRRD_DTYPES.get(header["type"]), "affine": affine}
+
+
+@register_header_reader("tifffile")
+def read_header_tifffile(file: str) -> dict[str, Any]:
+    import tifffile
+
+    with tifffile.TiffFile(file) as tif:
+        series = tif.series[0]
+        return {"shape": tuple(series.shape), "dtype": np.dtype(series.dtype), "affine": None}
+
+
+@register_header_reader("imageio", "imageioRGB")
+def read_header_imageio(file: str) -> dict[str, Any]:
+    import imageio.v3 as iio
+
+    props = iio.improps(file)
+    return {"shape": tuple(props.shape), "dtype": np.dtype(props.dtype), "affine": None}
+
+
+# PIL mode -> (channels, dtype) of np.asarray(image), 0 channels is a 2D array
+_PIL_MODES = {
+    "1": (0, np.bool_),
+    "L": (0, np.uint8),
+    "P": (0, np.uint8),
+    "I": (0, np.int32),
+    "I;16": (0, np.uint16),
+    "F": (0, np.float32),
+    "LA": (2, np.uint8),
+    "RGB": (3, np.uint8),
+    "RGBA": (4, np.uint8),
+}
+# the same for cv2.imread(IMREAD_UNCHANGED), palettes are left out, they expand to 3 or 4
+# channels depending on their transparency
+_CV2_MODES = {
+    "1": (0, np.uint8),
+    "L": (0, np.uint8),
+    "I;16": (0, np.uint16),
+    "LA": (4, np.uint8),
+    "RGB": (3, np.uint8),
+    "RGBA": (4, np.uint8),
+}
+
+
+def _image_header(file: str, modes: dict | None) -> dict[str, Any] | None:
+    from PIL import Image
+
+    with Image.open(file) as image:  # lazy, only the header is parsed
+        width, height = image.size
+        mode = image.mode
+    # the RGB backends always convert to 3 channel uint8
+    channels, dtype = modes.get(mode, (None, None)) if modes is not None else (3, np.uint8)
+    if dtype is None:
+        return None
+    shape = (height, width, channels) if channels else (height, width)
+    return {"shape": shape, "dtype": np.dtype(dtype), "affine": None}
+
+
+@register_header_reader("pil")
+def read_header_pil(file: str) -> dict[str, Any] | None:
+    return _image_header(file, _PIL_MODES)
+
+
+@register_header_reader("cv2")
+def read_header_cv2(file: str) -> dict[str, Any] | None:
+    return _image_header(file, _CV2_MODES)
+
+
+@register_header_reader("pilRGB", "cv2RGB")
+def read_header_rgb(file: str) -> dict[str, Any] | None:
+    return _image_header(file, None)
+
+
+def _npy_header(f) -> dict[str, Any]:
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+    return {"shape": tuple(shape), "dtype": np.dtype(dtype), "affine": None}
+
+
+@register_header_reader("numpy")
+def read_header_numpy(file: str) -> dict[str, Any] | None:
+    if not file.endswith(".npz"):
+        with open(file, "rb") as f:
+            return _npy_header(f)
+    # an archive loads as a dict of arrays, it only has a header if it holds a single array
+    with zipfile.ZipFile(file) as archive:
+        members = [n for n in archive.namelist() if n.endswith(".npy")]
+        if len(members) != 1:
+            return None
+        with archive.open(members[0]) as f:
+            return _npy_header(f)
+
+
+def _blosc2_header(file: str, metadata: dict) -> dict[str, Any]:
+    import blosc2
+
+    # opening maps the file and only decodes the b2nd metalayer, no chunks are decompressed
+    array = blosc2.open(urlpath=file, mode="r", mmap_mode="r")
+    if metadata is None:
+        metadata = {k: v for k, v in array.schunk.meta.items() if k != "b2nd"}
+    affine = metadata.get("affine")
+    return {
+        "shape": tuple(array.shape),
+        "dtype": np.dtype(array.dtype),
+        "affine": np.asarray(affine) if affine is not None else None,
+    }
+
+
+@register_header_reader("blosc2")
+def read_header_blosc2(file: str) -> dict[str, Any]:
+    return _blosc2_header(file, None)
+
+
+@register_header_reader("blosc2pkl")
+def read_header_blosc2pkl(file: str) -> dict[str, Any]:
+    from vidata.io.pickle_io import load_pickle
+
+    return _blosc2_header(file, load_pickle(file.replace(".b2nd", ".pkl")))
+
+
+def compare_headers(headers: dict[str, dict[str, Any]], atol: float = 1e-3) -> list[str]:
+    """Compare the headers of one case (layer name -> header), return the mismatches."""
+    issues = []
+    items = list(headers.items())
+    if not items:
+        return issues
+    ref_name, ref = items[0]
+    for name, header in items[1:]:
+        ndim = min(len(ref["shape"]), len(header["shape"]))
+        if tuple(ref["shape"])[:ndim] != tuple(header["shape"])[:ndim]:
+            issues.append(f"shape {name} {tuple(header['shape'])} != {ref_name} {ref['shape']}")
+        elif ref["affine"] is None or header["affine"] is None:
+            continue
+        elif np.shape(ref["affine"]) != np.shape(header["affine"]) or not np.allclose(
+            ref["affine"], header["affine"], atol=atol
+        ):
+            issues.append(f"affine {name} != {ref_name}")
+    return issues
+
+
+def validate_cases(
+    layers: list[tuple[str, list[Path], str]],
+    num_cases: int,
+    max_workers: int = 8,
+    should_stop: Callable[[], bool] | None = None,
+) -> dict[int, list[str]]:
+    """Check shapes and affines of all cases from headers only.
+
+    Args:
+        layers (list): (layer name, file list, backend) per layer.
+        num_cases (int): Number of cases to validate.
+        max_workers (int): Number of threads reading headers in parallel.
+        should_stop (Callable, optional): Polled between cases to abort early.
+
+    Returns:
+        dict[int, list[str]]: Index -> mismatch descriptions, only for mismatching cases.
+    """
+
+    def _validate(index):
+        if should_stop is not None and should_stop():
+            return index, []
+        headers = {}
+        issues = []
+        for name, files, backend in layers:
+            try:
+                header = read_header(files[index], backend)
+            except Exception as e:  # noqa: BLE001
+                issues.append(f"{name}: {e}")
+                continue
+            # layers without a known header are left out of the comparison
+            if header is not None:
+                headers[name] = header
+        return index, issues + compare_headers(headers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_validate, range(num_cases))
+        return {index: issues for index, issues in results if issues}
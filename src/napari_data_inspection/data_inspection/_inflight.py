@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import CancelledError, Future
+
+
+class InflightRegistry:
+    """Single-flight registry, concurrent requests for the same key share one future.
+
+    Keys identify a decode, e.g. (file, loader), so two layer blocks pointing at the same file
+    with the same loader, or a prefetch and a direct load of the same index, only decode once.
+    Every `submit`/`run` holds a reference on the shared future which is dropped by `release`,
+    a pending job is only cancelled once nobody is waiting for it anymore. The shared future is
+    owned by the registry, not by the executor, so whoever starts the job first (an executor
+    worker or `run`) decodes and all holders get that result.
+    """
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._lock = threading.RLock()
+        self._futures = {}
+        self._refs = {}
+
+    def __contains__(self, key):
+        return key in self._futures
+
+    def _register(self, key, future):
+        self._futures[key] = future
+        self._refs[key] = 0
+        future.add_done_callback(lambda fut, k=key: self._discard(k, fut))
+
+    def _discard(self, key, future):
+        with self._lock:
+            if self._futures.get(key) is future:
+                self._futures.pop(key, None)
+                self._refs.pop(key, None)
+
+    def _claim(self, future):
+        """Mark a queued shared future as running, False if it was started or cancelled."""
+        with self._lock:
+            if future.running() or future.done():
+                return False
+            return future.set_running_or_notify_cancel()
+
+    def _execute(self, future, fn, args):
+        # run may have taken the job over while it was queued
+        if not self._claim(future):
+            return
+        try:
+            result = fn(*args)
+        except BaseException as e:  # noqa: BLE001
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    @staticmethod
+    def _job_done(job, future):
+        # e.g. shutdown(cancel_futures=True), nobody would run the job anymore
+        if job.cancelled():
+            future.cancel()
+
+    def submit(self, key, fn, *args, executor=None):
+        """Schedule fn(*args) on the executor or attach to the job already running for key.
+
+        executor overrides the default executor, e.g. a separate low priority one.
+        """
+        executor = self._executor if executor is None else executor
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = Future()
+                self._register(key, future)
+                job = executor.submit(self._execute, future, fn, args)
+                job.add_done_callback(lambda job, fut=future: self._job_done(job, fut))
+            if key in self._refs:
+                self._refs[key] += 1
+            return future
+
+    def release(self, key, future):
+        with self._lock:
+            if future is None or self._futures.get(key) is not future:
+                return
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                future.cancel()
+
+    def run(self, key, fn, *args):
+        """Return fn(*args), waiting for an in-flight job for key instead of decoding again.
+
+        A job that is still queued behind other prefetches is taken over and run on the
+        calling thread, so the caller never waits for unrelated work. Other holders of the job
+        (e.g. a prefetch of the same file) get the result of the calling thread.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = Future()
+                self._register(key, future)
+            owner = self._claim(future)
+            self._refs[key] += 1
+
+        if owner:
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:  # noqa: BLE001
+                future.set_exception(e)
+            return future.result()
+
+        try:
+            return future.result()
+        except CancelledError:
+            return fn(*args)
+        finally:
+            self.release(key, future)
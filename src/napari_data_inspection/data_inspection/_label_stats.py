@@ -0,0 +1,86 @@
+import numpy as np
+
+try:
+    from scipy import ndimage
+except ImportError:  # scipy is optional, connected components are skipped without it
+    ndimage = None
+
+
+def voxel_volume(affine, ndim) -> float:
+    """Physical volume of one voxel, the absolute determinant of the spatial part of the affine."""
+    if affine is None:
+        return 1.0
+    affine = np.asarray(affine, dtype=float)
+    n = min(ndim, affine.shape[0] - 1)
+    return float(abs(np.linalg.det(affine[:n, :n]))) if n > 0 else 1.0
+
+
+def class_counts(data) -> dict[int, int]:
+    """Voxel count per class present in a labels array."""
+    data = np.asarray(data)
+    if data.size == 0:
+        return {}
+    if np.issubdtype(data.dtype, np.integer) and data.min() >= 0 and data.max() < 2**16:
+        # bincount is a single pass and much faster than np.unique's sort
+        counts = np.bincount(data.ravel())
+        classes = np.flatnonzero(counts)
+        return dict(zip(classes.tolist(), counts[classes].tolist(), strict=True))
+    classes, counts = np.unique(data, return_counts=True)
+    return dict(zip(classes.tolist(), counts.tolist(), strict=True))
+
+
+def count_components(mask) -> int | None:
+    """Number of connected components (full connectivity), None without scipy."""
+    if ndimage is None:
+        return None
+    structure = ndimage.generate_binary_structure(mask.ndim, mask.ndim)
+    return int(ndimage.label(mask, structure=structure)[1])
+
+
+def class_components(data, classes) -> dict[int, int | None]:
+    """Connected components of every class, each class is only labelled inside its bounding box.
+
+    The boxes of all classes come from a single find_objects pass, so this is about one pass over
+    the volume plus the boxes instead of one labelling of the whole volume per class.
+    """
+    data = np.asarray(data)
+    if ndimage is None:
+        return dict.fromkeys(classes)
+    boxes = None
+    if (
+        classes
+        and np.issubdtype(data.dtype, np.integer)
+        and 0 <= min(classes) <= max(classes) < 2**16
+    ):
+        boxes = ndimage.find_objects(data, max_label=max(classes))
+    components = {}
+    for cls in classes:
+        box = boxes[cls - 1] if boxes is not None and cls > 0 else None
+        region = data[box] if box is not None else data
+        components[cls] = count_components(region == cls)
+    return components
+
+
+def label_statistics(data, affine=None, components=True) -> dict[int, dict]:
+    """Statistics of every foreground class of a labels array.
+
+    Args:
+        data (array): Labels array.
+        affine (array): Affine of the file, used for the physical volume.
+        components (bool): Count connected components per class (needs scipy).
+
+    Returns:
+        dict: class -> {"voxels", "volume", "components"}, components is None if not computed.
+    """
+    data = np.asarray(data)
+    spacing_volume = voxel_volume(affine, data.ndim)
+    counts = {cls: count for cls, count in class_counts(data).items() if cls != 0}
+    per_class = class_components(data, list(counts)) if components else dict.fromkeys(counts)
+    return {
+        cls: {
+            "voxels": count,
+            "volume": count * spacing_volume,
+            "components": per_class[cls],
+        }
+        for cls, count in counts.items()
+    }
@@ -0,0 +1,68 @@
+import os
+import sys
+
+try:
+    import psutil
+except ImportError:  # psutil is optional, fall back to /proc on linux
+    psutil = None
+
+
+def process_rss() -> int:
+    """Resident set size of the current process in bytes (0 if unknown)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss is the peak, not the current RSS, but better than nothing
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def _meminfo() -> dict:
+    info = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                info[key] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        pass
+    return info
+
+
+def system_memory() -> tuple[int, int]:
+    """Return (available, total) system memory in bytes, (0, 0) if unknown."""
+    if psutil is not None:
+        vm = psutil.virtual_memory()
+        return vm.available, vm.total
+    info = _meminfo()
+    return info.get("MemAvailable", 0), info.get("MemTotal", 0)
+
+
+def nbytes(obj) -> int:
+    """Number of bytes held by arrays in (possibly nested) dicts, lists and tuples.
+
+    Containers are copied before they are walked, the caches are filled by the prefetch workers
+    while this runs on the GUI thread.
+    """
+    if isinstance(obj, dict):
+        return sum(nbytes(v) for v in list(obj.values()))
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes(v) for v in list(obj))
+    return int(getattr(obj, "nbytes", 0) or 0)
+
+
+def format_bytes(n: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
@@ -0,0 +1,171 @@
+import cProfile
+import json
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from napari_data_inspection.data_inspection._memory import process_rss
+
+TRACE_VERSION = 1
+
+
+class SessionRecorder:
+    """Records navigation events of a session into a replayable trace.
+
+    Every navigation is one event with the case index, start/end timestamps relative to the
+    session start and per layer the cache state ("hit", "inflight" or "miss"), the load and the
+    render duration. Render durations cover updating the napari layer and camera, not the draw
+    which happens later in the Qt event loop.
+    """
+
+    def __init__(self, project=None, profile_cpu=False, trace_memory=False):
+        self.project = project
+        self.events = []
+        self.created = datetime.now().isoformat(timespec="seconds")
+        self._start = time.perf_counter()
+        self._event = None
+        self._profile = cProfile.Profile() if profile_cpu else None
+        self._trace_memory = trace_memory and not tracemalloc.is_tracing()
+        if self._profile is not None:
+            self._profile.enable()
+        if self._trace_memory:
+            tracemalloc.start()
+
+    def now(self):
+        return time.perf_counter() - self._start
+
+    def begin(self, index):
+        self._event = {"index": int(index), "start": self.now(), "layers": {}}
+
+    def record_layer(self, name, cache, load, render):
+        if self._event is not None:
+            self._event["layers"][name] = {"cache": cache, "load": load, "render": render}
+
+    def end(self):
+        event, self._event = self._event, None
+        if event is None:
+            return
+        event["end"] = self.now()
+        event["rss"] = process_rss()
+        if tracemalloc.is_tracing():
+            event["traced_memory"] = tracemalloc.get_traced_memory()[0]
+        self.events.append(event)
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+
+    def dump(self, path, top=20):
+        """Write the trace to path, cProfile stats go to <path>.prof if enabled."""
+        self.stop()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trace = {
+            "version": TRACE_VERSION,
+            "created": self.created,
+            "project": self.project,
+            "events": self.events,
+            "summary": summarize(self.events),
+        }
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            trace["tracemalloc"] = [str(s) for s in snapshot.statistics("lineno")[:top]]
+            if self._trace_memory:
+                tracemalloc.stop()
+        if self._profile is not None:
+            self._profile.dump_stats(str(path) + ".prof")
+        with open(path, "w") as f:
+            json.dump(trace, f, indent=1, default=str)
+        return path
+
+
+def summarize(events) -> dict:
+    """Navigation duration percentiles, cache hit rate and load/render time summed over layers."""
+    if not events:
+        return {}
+    durations = np.array([e["end"] - e["start"] for e in events])
+    layers = [layer for e in events for layer in e["layers"].values()]
+    hits = sum(layer["cache"] == "hit" for layer in layers)
+    return {
+        "navigations": len(events),
+        "mean": float(durations.mean()),
+        "p50": float(np.percentile(durations, 50)),
+        "p95": float(np.percentile(durations, 95)),
+        "max": float(durations.max()),
+        "hit_rate": hits / len(layers) if layers else None,
+        "load": float(sum(layer["load"] for layer in layers)),
+        "render": float(sum(layer["render"] for layer in layers)),
+    }
+
+
+def load_trace(path) -> dict:
+    with open(path) as f:
+        trace = json.load(f)
+    if trace.get("version") != TRACE_VERSION:
+        raise ValueError(f"Unsupported trace version {trace.get('version')}")
+    return trace
+
+
+def replay_trace(
+    widget,
+    trace,
+    realtime=True,
+    process_events=None,
+    output=None,
+    profile_cpu=False,
+    trace_memory=False,
+) -> list[dict]:
+    """Re-run the navigation of a trace against a DataInspectionWidget and record it again.
+
+    Args:
+        widget: DataInspectionWidget with the project of the trace loaded.
+        trace (dict): Trace from `load_trace`.
+        realtime (bool): Keep the recorded gaps between navigations, so prefetching gets the
+            same time to run as in the recorded session.
+        process_events (callable): Called while waiting, e.g. QApplication.processEvents, so
+            queued prefetch callbacks are delivered.
+        output (Path): Where to write the trace of the replay, see `stop_profiling`.
+        profile_cpu (bool): Run cProfile during the replay.
+        trace_memory (bool): Run tracemalloc during the replay.
+
+    Returns:
+        list: The replayed events.
+    """
+    # layer directories are scanned in the background
+    while process_events is not None and any(lb.scanning for lb in widget.layer_blocks):
+        process_events()
+        time.sleep(0.01)
+
+    recorder = widget.start_profiling(profile_cpu, trace_memory)
+    previous = None
+    for event in trace["events"]:
+        if realtime and previous is not None:
+            wait_until = time.perf_counter() + max(event["start"] - previous, 0)
+            while time.perf_counter() < wait_until:
+                if process_events is not None:
+                    process_events()
+                time.sleep(0.001)
+        previous = event["start"]
+        widget.navigate_to(event["index"])
+        if process_events is not None:
+            process_events()
+            # the next step would be coalesced with this one
+            while widget.loading:
+                process_events()
+                time.sleep(0.001)
+    widget.stop_profiling(output)
+    return recorder.events
+
+
+def compare_summaries(recorded, replayed) -> str:
+    """Side by side table of two trace summaries."""
+    lines = [f"{'':<12}{'recorded':>12}{'replayed':>12}"]
+    for key in ["navigations", "mean", "p50", "p95", "max", "hit_rate", "load", "render"]:
+        a, b = recorded.get(key), replayed.get(key)
+        fmt = (lambda v: f"{v:.4f}") if key != "navigations" else str
+        a, b = ("-" if v is None else fmt(v) for v in (a, b))
+        lines.append(f"{key:<12}{a:>12}{b:>12}")
+    return "\n".join(lines)
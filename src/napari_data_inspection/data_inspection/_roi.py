@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def _nonzero_extent(mask):
+    # the projection onto the first axis needs one pass, everything else is derived from the
+    # (much smaller) projection along the first axis
+    first = np.flatnonzero(np.any(mask.reshape(mask.shape[0], -1), axis=1))
+    if first.size == 0:
+        return None
+    starts, stops = [int(first[0])], [int(first[-1]) + 1]
+    if mask.ndim > 1:
+        rest = _nonzero_extent(np.any(mask, axis=0))
+        starts += rest[0]
+        stops += rest[1]
+    return starts, stops
+
+
+def foreground_bbox(mask):
+    """Bounding box of the non-zero voxels as (starts, stops, shape), None for empty masks."""
+    mask = np.asarray(mask)
+    if mask.size == 0:
+        return None
+    extent = _nonzero_extent(mask)
+    if extent is None:
+        return None
+    return tuple(extent[0]), tuple(extent[1]), tuple(mask.shape)
+
+
+def union_bboxes(bboxes):
+    """Smallest box containing all given boxes of the same shape, None entries are skipped."""
+    bboxes = [b for b in bboxes if b is not None]
+    if not bboxes:
+        return None
+    shape = bboxes[0][2]
+    bboxes = [b for b in bboxes if b[2] == shape]
+    starts = tuple(int(s) for s in np.min([b[0] for b in bboxes], axis=0))
+    stops = tuple(int(s) for s in np.max([b[1] for b in bboxes], axis=0))
+    return starts, stops, shape
+
+
+def crop_to_bbox(data, affine, bbox, margin=0):
+    """Crop data to bbox grown by margin and shift the affine so the crop stays in place.
+
+    Only the leading axes covered by the box are cropped (e.g. trailing RGB channels are kept).
+    Returns (cropped data, affine, offset) or None if data does not match the box shape.
+    """
+    starts, stops, shape = bbox
+    n = len(shape)
+    if tuple(data.shape[:n]) != tuple(shape):
+        return None
+    starts = np.maximum(np.asarray(starts) - margin, 0)
+    stops = np.minimum(np.asarray(stops) + margin, shape)
+    slices = tuple(slice(int(a), int(b)) for a, b in zip(starts, stops, strict=True))
+    # copy, a view would keep the whole volume alive
+    cropped = np.array(data[slices])
+
+    ndim = data.ndim
+    affine = np.eye(ndim + 1) if affine is None else np.array(affine, dtype=float)
+    offset = np.zeros(affine.shape[0] - 1)
+    offset[:n] = starts
+    affine[:-1, -1] += affine[:-1, :-1] @ offset
+    return cropped, affine, tuple(int(s) for s in starts)
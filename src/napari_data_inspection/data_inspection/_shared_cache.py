@@ -0,0 +1,372 @@
+"""Cross-process cache of decoded arrays in named shared memory segments.
+
+A small coordinator process (a multiprocessing manager server) owns all segments and keeps the
+index file -> segment. Viewers decode a file once, copy it into a segment allocated by the
+coordinator and every other viewer of the same user maps it read-only.
+
+The coordinator listens on a unix socket in a per-user runtime directory (mode 0700) and both
+sides authenticate with a random key stored there (mode 0600). Manager connections unpickle
+what they receive, so only processes of the same user may ever talk to it.
+
+Run ``python -m napari_data_inspection.data_inspection._shared_cache`` to start a coordinator
+by hand, otherwise the first viewer with the shared cache enabled starts one. Neither imports
+napari or Qt. The coordinator exits once no viewer process is connected anymore and unlinks
+all segments.
+"""
+
+import argparse
+import contextlib
+import getpass
+import os
+import secrets
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client
+from multiprocessing.managers import BaseManager
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_SIZE = 8 * 1024**3
+
+
+def runtime_dir() -> Path:
+    """Per-user directory of the coordinator socket and key, only accessible by the user."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    path = Path(base) / f"napari-data-inspection-{getpass.getuser()}"
+    path.mkdir(mode=0o700, exist_ok=True)
+    if os.name == "posix":
+        info = path.lstat()
+        # never trust a directory someone else created or can write to
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+            raise PermissionError(f"{path} is not a private directory of this user")
+    return path
+
+
+def default_address():
+    if os.name == "nt":
+        return rf"\\.\pipe\napari-data-inspection-{getpass.getuser()}"
+    return str(runtime_dir() / "coordinator.sock")
+
+
+def load_authkey() -> bytes:
+    """Random key shared by the coordinator and the viewers of this user, created on first use."""
+    path = runtime_dir() / "authkey"
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        if os.name == "posix":
+            info = path.lstat()
+            if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+                raise PermissionError(f"{path} is not a private file of this user") from None
+        return path.read_bytes()
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def _remove_stale_socket(address, authkey):
+    """Unlink the socket of a crashed coordinator, binding would fail otherwise."""
+    if not isinstance(address, str) or not os.path.exists(address):
+        return
+    try:
+        Client(address, authkey=authkey).close()
+    except ConnectionRefusedError:
+        os.unlink(address)
+
+
+def shared_key(loader, file) -> str:
+    """Key of a decode, valid across processes and invalidated when the file changes."""
+    path = Path(file).resolve()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        mtime = 0
+    return f"{loader.__module__}.{loader.__qualname__}:{path}:{mtime}"
+
+
+def _attach(name) -> SharedMemory:
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:  # python < 3.13 also tracks attached segments and unlinks them at exit
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedArrayIndex:
+    """Index of the coordinator, file key -> segment, evicts least recently used segments."""
+
+    def __init__(self, max_bytes=DEFAULT_SIZE):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> {"name", "shape", "dtype", "meta", "nbytes", "ready"}
+        self._entries = OrderedDict()
+        self._segments = {}
+        self._clients = set()
+        self._last_client = time.monotonic()
+
+    def register(self, pid):
+        with self._lock:
+            self._clients.add(pid)
+
+    def unregister(self, pid):
+        with self._lock:
+            self._clients.discard(pid)
+            self._last_client = time.monotonic()
+
+    def lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry["ready"]:
+                return None
+            self._entries.move_to_end(key)
+            return entry["name"], entry["shape"], entry["dtype"], entry["meta"]
+
+    def allocate(self, key, size):
+        """Create a segment for key, None if key is already cached/allocated or too large."""
+        with self._lock:
+            if key in self._entries or size > self.max_bytes:
+                return None
+            self._evict(self.max_bytes - size)
+            shm = SharedMemory(create=True, size=max(int(size), 1))
+            self._segments[shm.name] = shm
+            self._entries[key] = {"name": shm.name, "nbytes": int(size), "ready": False}
+            return shm.name
+
+    def commit(self, key, shape, dtype, meta):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.update(shape=tuple(shape), dtype=dtype, meta=meta, ready=True)
+
+    def discard(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            return len(self._entries), sum(e["nbytes"] for e in self._entries.values())
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        shm = self._segments.pop(entry["name"])
+        # viewers which mapped the segment keep their mapping, only the name is removed
+        shm.close()
+        shm.unlink()
+
+    def _evict(self, budget):
+        used = sum(e["nbytes"] for e in self._entries.values())
+        for key in list(self._entries):
+            if used <= budget:
+                break
+            if self._entries[key]["ready"]:
+                used -= self._entries[key]["nbytes"]
+                self._remove(key)
+
+    def close(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def idle(self, timeout):
+        """True if no viewer process is alive anymore and the last left timeout seconds ago."""
+        with self._lock:
+            for pid in list(self._clients):
+                if not _pid_alive(pid):
+                    self._clients.discard(pid)
+                    self._last_client = time.monotonic()
+            return not self._clients and time.monotonic() - self._last_client > timeout
+
+
+def _windows_pid_alive(pid) -> bool:
+    import ctypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    STILL_ACTIVE = 259
+    ERROR_ACCESS_DENIED = 5
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # the process exists but belongs to someone else
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        exit_code = ctypes.c_ulong()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return True
+        return exit_code.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _pid_alive(pid) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) calls TerminateProcess on Windows, it would kill the viewer
+        return _windows_pid_alive(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+class _CoordinatorManager(BaseManager):
+    pass
+
+
+def serve(address=None, authkey=None, max_bytes=DEFAULT_SIZE, timeout=30):
+    """Run the coordinator until no viewer is connected for timeout seconds."""
+    address = default_address() if address is None else address
+    authkey = load_authkey() if authkey is None else authkey
+    _remove_stale_socket(address, authkey)
+    index = SharedArrayIndex(max_bytes)
+    _CoordinatorManager.register("index", callable=lambda: index)
+    server = _CoordinatorManager(address=address, authkey=authkey).get_server()
+
+    def _watchdog():
+        while not index.idle(timeout):
+            time.sleep(1)
+        index.close()
+        server.stop_event.set()
+
+    threading.Thread(target=_watchdog, daemon=True).start()
+    server.serve_forever()
+
+
+class SharedArrayCache:
+    """Client of the coordinator, maps cached arrays read-only into this process."""
+
+    def __init__(self, address=None, authkey=None, max_bytes=DEFAULT_SIZE):
+        self.address = default_address() if address is None else address
+        self.authkey = load_authkey() if authkey is None else authkey
+        self.max_bytes = max_bytes
+        self._index = None
+        self._lock = threading.Lock()
+        # segment name -> (SharedMemory, weakref of the array using it)
+        self._mapped = {}
+
+    def connect(self, start=True, timeout=10.0):
+        """Connect to the coordinator, start one if none is running and start is True."""
+        _CoordinatorManager.register("index")
+        deadline = time.monotonic() + timeout
+        started = False
+        while True:
+            try:
+                manager = _CoordinatorManager(address=self.address, authkey=self.authkey)
+                manager.connect()
+                self._index = manager.index()
+                break
+            except (ConnectionError, OSError, EOFError):
+                # also a socket left behind by a crashed coordinator, the new one removes it
+                if not start or time.monotonic() > deadline:
+                    raise
+                if not started:
+                    self._start_coordinator()
+                    started = True
+                time.sleep(0.2)
+        self._index.register(os.getpid())
+        return self
+
+    def _start_coordinator(self):
+        # detached, so the coordinator outlives the viewer which started it
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                __name__,
+                "--address",
+                self.address,
+                "--size",
+                str(self.max_bytes),
+            ],
+            start_new_session=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def close(self):
+        if self._index is not None:
+            with contextlib.suppress(ConnectionError, OSError, EOFError):
+                self._index.unregister(os.getpid())
+            self._index = None
+        self._release_unused()
+
+    def _release_unused(self):
+        with self._lock:
+            for name, (shm, ref) in list(self._mapped.items()):
+                if ref() is None:
+                    shm.close()
+                    del self._mapped[name]
+
+    def _map(self, name, shape, dtype):
+        shm = _attach(name)
+        data = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        data.flags.writeable = False
+        with self._lock:
+            self._mapped[name + f":{id(data)}"] = (shm, weakref.ref(data))
+        return data
+
+    def get(self, key):
+        """Return (read-only data, meta) of a cached decode or None."""
+        self._release_unused()
+        try:
+            entry = self._index.lookup(key)
+            if entry is None:
+                return None
+            name, shape, dtype, meta = entry
+            return self._map(name, shape, dtype), meta
+        except (ConnectionError, OSError, EOFError, FileNotFoundError):
+            # coordinator gone or segment evicted in between, decode locally
+            return None
+
+    def put(self, key, data, meta):
+        """Share a decoded array, returns the shared read-only copy or data if not shareable."""
+        if not isinstance(data, np.ndarray) or data.dtype.hasobject:
+            return data, meta
+        try:
+            name = self._index.allocate(key, data.nbytes)
+            if name is None:
+                return data, meta
+            shared = _attach(name)
+            try:
+                np.ndarray(data.shape, dtype=data.dtype, buffer=shared.buf)[...] = data
+            finally:
+                shared.close()
+            self._index.commit(key, data.shape, data.dtype.str, meta)
+            return self._map(name, data.shape, data.dtype.str), meta
+        except (ConnectionError, OSError, EOFError):
+            return data, meta
+
+    def stats(self):
+        try:
+            return self._index.stats()
+        except (ConnectionError, OSError, EOFError):
+            return 0, 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared array cache coordinator")
+    parser.add_argument("--address", default=None, help="Socket path, per-user default")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Cache size in bytes")
+    parser.add_argument(
+        "--timeout", type=float, default=30, help="Exit after this many seconds without viewers"
+    )
+    args = parser.parse_args()
+    serve(args.address, None, args.size, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
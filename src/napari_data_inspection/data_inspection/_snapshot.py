@@ -0,0 +1,312 @@
+"""Headless snapshots of cases: mid-slices of every layer with the labels overlaid, as PNG.
+
+Everything is plain numpy (no napari, no OpenGL), so cases can be rendered in a process pool.
+The workers only import this module and vidata, the package init does not load napari or Qt.
+"""
+
+import concurrent.futures
+import multiprocessing
+import re
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from napari_data_inspection.data_inspection._header_io import read_header
+from napari_data_inspection.data_inspection._roi import foreground_bbox, union_bboxes
+
+SEPARATOR = 2
+
+
+def write_png(path, rgb):
+    """Write a (H, W, 3) uint8 array as an 8 bit RGB PNG."""
+    rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+    height, width = rgb.shape[:2]
+    # every scanline starts with filter type 0 (None)
+    raw = np.concatenate([np.zeros((height, 1), np.uint8), rgb.reshape(height, -1)], axis=1)
+
+    def chunk(tag, data):
+        return (
+            struct.pack(">I", len(data))
+            + tag
+            + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", header))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def label_palette(n=256):
+    """Distinct colours for label values, golden ratio spaced hues (class 0 is unused)."""
+    hue = (np.arange(n) * 0.618033988749895) % 1.0
+    # hsv -> rgb with s = v = 1
+    k = (np.array([5, 3, 1])[None, :] + hue[:, None] * 6) % 6
+    rgb = 1 - np.clip(np.minimum(k, 4 - k), 0, 1)
+    return (rgb * 255).astype(np.uint8)
+
+
+def to_gray(image, percentiles=(0.5, 99.5)):
+    """Window an image slice to uint8 with robust percentiles, RGB slices are kept."""
+    image = np.asarray(image)
+    if image.ndim == 3 and image.shape[-1] in (3, 4):
+        if image.dtype == np.uint8:
+            return image[..., :3]
+        image = image[..., :3].mean(-1)
+    image = image.astype(np.float32)
+    finite = image[np.isfinite(image)]
+    lo, hi = np.percentile(finite, percentiles) if finite.size else (0.0, 1.0)
+    gray = np.clip((image - lo) / max(hi - lo, 1e-8), 0, 1)
+    return np.repeat((gray * 255).astype(np.uint8)[..., None], 3, axis=-1)
+
+
+def overlay(rgb, labels, alpha=0.5, palette=None):
+    """Blend the non-zero labels into rgb."""
+    palette = label_palette() if palette is None else palette
+    labels = np.asarray(labels).astype(np.int64)
+    mask = labels > 0
+    if mask.any():
+        colors = palette[labels[mask] % len(palette)].astype(np.float32)
+        rgb = rgb.copy()
+        rgb[mask] = ((1 - alpha) * rgb[mask] + alpha * colors).astype(np.uint8)
+    return rgb
+
+
+def _spacing(affine, ndim):
+    if affine is None:
+        return np.ones(ndim)
+    affine = np.asarray(affine, dtype=float)
+    n = min(ndim, affine.shape[0] - 1)
+    spacing = np.ones(ndim)
+    spacing[:n] = np.linalg.norm(affine[:n, :n], axis=0)
+    return spacing
+
+
+def _resample(tile, spacing):
+    """Nearest neighbour resampling of a 2D tile to square pixels of the finest spacing."""
+    spacing = np.where(spacing > 0, spacing, 1)
+    scale = spacing / spacing.min()
+    if np.allclose(scale, 1):
+        return tile
+    rows = (np.arange(int(round(tile.shape[0] * scale[0]))) / scale[0]).astype(int)
+    cols = (np.arange(int(round(tile.shape[1] * scale[1]))) / scale[1]).astype(int)
+    return tile[np.minimum(rows, tile.shape[0] - 1)][:, np.minimum(cols, tile.shape[1] - 1)]
+
+
+def mid_slices(data, center, spacing, spatial_ndim):
+    """(slice, in-plane spacing) per orientation through center, 3 for volumes, 1 for 2D."""
+    if spatial_ndim < 3:
+        return [(data, spacing[:2])]
+    slices = []
+    for axis in range(3):
+        index = [slice(None)] * data.ndim
+        index[axis] = int(center[axis])
+        in_plane = [a for a in range(3) if a != axis]
+        slices.append((data[tuple(index)], spacing[in_plane]))
+    return slices
+
+
+def _hstack(tiles, background=0):
+    height = max(t.shape[0] for t in tiles)
+    padded = []
+    for t in tiles:
+        pad = np.full((height, t.shape[1] + SEPARATOR, 3), background, np.uint8)
+        pad[: t.shape[0], : t.shape[1]] = t
+        padded.append(pad)
+    return np.concatenate(padded, axis=1)[:, :-SEPARATOR]
+
+
+def _vstack(rows, background=0):
+    width = max(r.shape[1] for r in rows)
+    padded = []
+    for r in rows:
+        pad = np.full((r.shape[0] + SEPARATOR, width, 3), background, np.uint8)
+        pad[: r.shape[0], : r.shape[1]] = r
+        padded.append(pad)
+    return np.concatenate(padded, axis=0)[:-SEPARATOR]
+
+
+def thumbnail(rgb, size):
+    """Strided nearest neighbour downscale so the longer side is at most size."""
+    step = int(np.ceil(max(rgb.shape[:2]) / size))
+    return rgb[::step, ::step] if step > 1 else rgb
+
+
+def load_layer(target, file_type, backend, file):
+    from vidata import LOADER_REGISTRY
+
+    return LOADER_REGISTRY[target][file_type][backend](file)
+
+
+def render_case(index, name, layers, out_dir, alpha=0.5, thumb_size=128):
+    """Render one case to <out_dir>/<index>_<name>.png.
+
+    Args:
+        index (int): Case index, used for the file name.
+        name (str): Case name.
+        layers (list): (layer name, file, "image" | "mask", file_type, backend) per layer.
+        out_dir (Path): Output directory.
+        alpha (float): Opacity of the labels overlay.
+        thumb_size (int): Size of the returned thumbnail.
+
+    Returns:
+        tuple: (path of the PNG, thumbnail for the contact sheet).
+    """
+    images, labels = [], []
+    for _, file, target, file_type, backend in layers:
+        data, meta = load_layer(target, file_type, backend, file)
+        data = np.asarray(data[...])
+        affine = meta.get("affine")
+        rgb = target == "image" and data.ndim == 3 and data.shape[-1] in (3, 4)
+        # time series and other leading axes: use the middle frame
+        while data.ndim > 3 + rgb:
+            # the affine only covers the leading axis if it has a row/column for every axis
+            if affine is not None and np.asarray(affine).shape[0] == data.ndim + 1:
+                affine = np.asarray(affine)[1:, 1:]
+            data = data[data.shape[0] // 2]
+        (labels if target == "mask" else images).append((data, affine))
+
+    reference = images[0] if images else labels[0]
+    rgb_image = reference[0].ndim == 3 and reference[0].shape[-1] in (3, 4) and bool(images)
+    spatial_ndim = reference[0].ndim - (1 if rgb_image else 0)
+    shape = reference[0].shape[:spatial_ndim]
+    spacing = _spacing(reference[1], spatial_ndim)
+
+    # cut through the labels if there are any, the volume center is mostly background
+    bbox = union_bboxes(
+        [foreground_bbox(lbl) for lbl, _ in labels if lbl.shape[:spatial_ndim] == shape]
+    )
+    center = (
+        [(a + b - 1) // 2 for a, b in zip(bbox[0], bbox[1], strict=True)]
+        if bbox is not None
+        else [s // 2 for s in shape]
+    )
+
+    label_slices = [
+        [s for s, _ in mid_slices(lbl, center, spacing, spatial_ndim)]
+        for lbl, _ in labels
+        if lbl.shape[:spatial_ndim] == shape
+    ]
+    rows = []
+    for image, _ in images or [(np.zeros(shape, np.uint8), None)]:
+        if image.shape[:spatial_ndim] != shape:
+            continue
+        tiles = []
+        for i, (tile, tile_spacing) in enumerate(mid_slices(image, center, spacing, spatial_ndim)):
+            tile = to_gray(tile)
+            for lbl in label_slices:
+                tile = overlay(tile, lbl[i], alpha)
+            tiles.append(_resample(tile, np.asarray(tile_spacing)))
+        rows.append(_hstack(tiles))
+    sheet = _vstack(rows)
+
+    out_dir = Path(out_dir)
+    safe_name = re.sub(r"[^\w.-]+", "_", str(name))
+    path = out_dir / f"{index:05d}_{safe_name}.png"
+    write_png(path, sheet)
+    return path, thumbnail(sheet, thumb_size)
+
+
+def estimate_case_bytes(layers) -> int:
+    """Rough peak memory of rendering a case, from the file headers (0 if unknown)."""
+    total = 0
+    for _, file, _, _, backend in layers:
+        try:
+            header = read_header(file, backend)
+        except Exception:  # noqa: BLE001
+            return 0
+        if header is None:
+            return 0
+        # the decoded array plus a float32 copy for windowing
+        total += int(np.prod(header["shape"])) * (np.dtype(header["dtype"]).itemsize + 4)
+    return total
+
+
+def contact_sheet(thumbnails, columns=8, size=128, background=32):
+    """Grid of the case thumbnails."""
+    rows = int(np.ceil(len(thumbnails) / columns))
+    cell = size + SEPARATOR
+    sheet = np.full((max(rows, 1) * cell, columns * cell, 3), background, np.uint8)
+    for i, thumb in enumerate(thumbnails):
+        r, c = divmod(i, columns)
+        h, w = min(thumb.shape[0], size), min(thumb.shape[1], size)
+        sheet[r * cell : r * cell + h, c * cell : c * cell + w] = thumb[:h, :w]
+    return sheet
+
+
+def render_snapshots(
+    cases,
+    out_dir,
+    max_workers=4,
+    memory_budget=None,
+    alpha=0.5,
+    thumb_size=128,
+    columns=8,
+    progress=None,
+    should_stop=None,
+):
+    """Render every case in a process pool and write a contact sheet of all of them.
+
+    Args:
+        cases (list): (index, name, layers) per case, see `render_case` for layers.
+        out_dir (Path): Output directory, created if needed.
+        max_workers (int): Number of worker processes.
+        memory_budget (int): Bytes the cases rendered at once may need (estimated from the
+            headers), at least one case is always rendered. None for no limit.
+        progress (callable): Called with (done, total) after every case.
+        should_stop (callable): Returns True to stop submitting further cases.
+
+    Returns:
+        tuple: (list of written PNGs, path of the contact sheet or None).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results = {}
+    pending = {}
+    in_flight = 0
+    queue = list(cases)
+    # spawn, forking a process with running Qt/loader threads is not safe
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        while queue or pending:
+            while queue and len(pending) < max_workers and not (should_stop and should_stop()):
+                index, name, layers = queue[0]
+                cost = estimate_case_bytes(layers) if memory_budget else 0
+                if pending and memory_budget and in_flight + cost > memory_budget:
+                    break
+                queue.pop(0)
+                future = executor.submit(
+                    render_case, index, name, layers, out_dir, alpha, thumb_size
+                )
+                pending[future] = (index, cost)
+                in_flight += cost
+            if should_stop and should_stop():
+                queue = []
+            if not pending:
+                break
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                index, cost = pending.pop(future)
+                in_flight -= cost
+                try:
+                    results[index] = future.result()
+                except Exception as e:  # noqa: BLE001
+                    print(f"Snapshot of case {index} failed: {e}")
+                if progress is not None:
+                    progress(len(results), len(cases))
+
+    paths = [results[i][0] for i in sorted(results)]
+    if not results:
+        return paths, None
+    sheet_path = out_dir / "contact_sheet.png"
+    thumbs = [results[i][1] for i in sorted(results)]
+    write_png(sheet_path, contact_sheet(thumbs, columns, thumb_size))
+    return paths, sheet_path
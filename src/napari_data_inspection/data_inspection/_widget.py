@@ -1,75 +1,222 @@
+from contextlib import ExitStack, suppress
+from functools import partial
 from pathlib import Path
+from time import perf_counter
 from typing import TYPE_CHECKING
 
 import numpy as np
 from napari.layers import Image, Labels
 from napari_toolkit.utils import get_value
+from qtpy.QtCore import Qt, Signal
 
+from napari_data_inspection.data_inspection._frames import LazyFrameArray
 from napari_data_inspection.data_inspection._widget_io import DataInspectionWidget_IO
 
 if TYPE_CHECKING:
     import napari
 
+EXTENT_EVENTS = ("extent", "_extent_augmented")
+
+
+class _CaseLoad:
+    """A case whose cache misses are decoding, collected on the GUI thread."""
+
+    def __init__(self, layer_blocks, index, on_loaded):
+        self.layer_blocks = layer_blocks
+        self.index = index
+        self.on_loaded = on_loaded
+        self.start = perf_counter()
+        self.results = []
+        self.pending = 0
+
 
 class DataInspectionWidget(DataInspectionWidget_IO):
+    # (case load, layer position, future) of a decoded cache miss, delivered on the GUI thread
+    _layer_fetched = Signal(object)
+
     def __init__(self, viewer: "napari.viewer.Viewer"):
         super().__init__(viewer)
 
         self.cache_data = {}
         self.cache_meta = {}
+        # always queued, also for futures that are done before their callback is added
+        self._layer_fetched.connect(self._on_layer_fetched, Qt.QueuedConnection)
 
     def load_data(self, layer_block, index):
+        self.load_case([layer_block], index)
 
-        file = layer_block[index]
+    def load_case(self, layer_blocks, index, on_loaded=None):
+        """Show a case, the viewer is only touched once the data of all layers is ready.
 
-        file_name = layer_block.fm.name_from_path(file)
-        layer_name = f"{layer_block.name} - {index} - {file_name}"
+        Cache misses are decoded on the navigation workers and handed back through a queued
+        signal, the GUI thread never waits for them. on_loaded(index) is called once the layers
+        are updated, right away if every layer was cached.
+        """
+        load = _CaseLoad(layer_blocks, index, on_loaded)
+        load.results, pending = self.fetch_case(layer_blocks, index)
+        if not pending:
+            self.show_case(load)
+            return
+        load.pending = len(pending)
+        self._loads.add(load)
+        for i, future in pending.items():
+            future.add_done_callback(partial(self._emit_fetched, load, i))
 
-        if layer_block.name in self.cache_data and str(index) in self.cache_data[layer_block.name]:
-            data = self.cache_data[layer_block.name].pop(str(index))
-            meta = self.cache_meta[layer_block.name].pop(str(index))
+    def _emit_fetched(self, load, i, future):
+        # RuntimeError: the widget was deleted while the file was decoding
+        with suppress(RuntimeError):
+            self._layer_fetched.emit((load, i, future))
+
+    def _on_layer_fetched(self, fetched):
+        load, i, future = fetched
+        try:
+            data, meta = future.result()
+        except Exception as e:  # noqa: BLE001
+            print(f"Loading {load.layer_blocks[i].name} at Index {load.index} failed: {e}")
+            load.results[i] = None
         else:
-            data, meta = layer_block.load_data(file)
-        affine = meta.get(
-            "affine"
-        )  # if not get_value(self.ignore_affine) else np.eye(data.ndim + 1)
+            load.results[i] = (data, meta, load.results[i][2], perf_counter() - load.start)
+        load.pending -= 1
+        if not load.pending:
+            self._loads.discard(load)
+            self.show_case(load)
+
+    def fetch_case(self, layer_blocks, index):
+        """(data, meta, cache state, load seconds) per layer and the futures of the cache misses.
+
+        The results of the misses are placeholders until their future is done.
+        """
+        start = perf_counter()
+        results, pending = [], {}
+        for i, layer_block in enumerate(layer_blocks):
+            name, idx = layer_block.name, str(index)
+            if idx in self.cache_data.get(name, {}):
+                data = self.cache_data[name].pop(idx)
+                meta = self.cache_meta[name].pop(idx)
+                results.append((data, meta, "hit", perf_counter() - start))
+                continue
+            file = layer_block[index]
+            if self.is_streamed(layer_block, file):
+                results.append((*self.decode(layer_block, index), "stream", 0.0))
+                continue
+            # everything the worker needs is read here, the workers must not touch Qt objects
+            key, function, args = self.load_job(layer_block, index)
+            cache = "inflight" if key in self._inflight else "miss"
+            # waits for an in-flight prefetch of this file instead of decoding it again
+            pending[i] = self._navigation_executor.submit(self._inflight.run, key, function, *args)
+            results.append((None, None, cache, 0.0))
+        return results, pending
+
+    def show_case(self, load):
+        updates = []
+        for layer_block, fetched in zip(load.layer_blocks, load.results, strict=True):
+            # failed to load, or the layer was removed while loading
+            if fetched is None or layer_block not in self.layer_blocks:
+                continue
+            data, meta, cache, seconds = fetched
+            update = self.prepare_update(layer_block, load.index, data, meta)
+            if update is not None:
+                updates.append((layer_block, update, cache, seconds))
+        self.apply_updates(updates)
+        if load.on_loaded is not None:
+            load.on_loaded(load.index)
+        if self._refresh_queued and not self.loading:
+            self._refresh_queued = False
+            self.refresh()
+
+    def prepare_update(self, layer_block, index, data, meta):
+        """Convert the data of a layer, everything but touching the viewer.
+
+        In ROI mode the data was already cropped by the worker that decoded it.
+        """
+        if layer_block.ltype not in ("Image", "Labels"):
+            return None
+        file_name = layer_block.fm.name_from_path(layer_block[index])
+        streamed = isinstance(data, LazyFrameArray)
+        affine = meta.get("affine")
         affine_to_use = (
             affine
             if affine is not None and not get_value(self.ignore_affine)
             else np.eye(data.ndim + 1)
         )
 
-        if layer_block.ltype == "Labels" and not np.issubdtype(data.dtype, np.integer):
+        if (
+            layer_block.ltype == "Labels"
+            and not np.issubdtype(data.dtype, np.integer)
+            and not streamed
+        ):
             data = data.astype(int)
 
-        target_layer = [
-            layer for layer in self.viewer.layers if layer.name.startswith(f"{layer_block.name} - ")
-        ]
-        if len(target_layer) == 0:
-            if layer_block.ltype == "Image":
-                layer = Image(
-                    data=data, affine=affine_to_use, name=layer_name, metadata={"affine": affine}
-                )
-            elif layer_block.ltype == "Labels":
-                layer = Labels(
-                    data=data, affine=affine_to_use, name=layer_name, metadata={"affine": affine}
-                )
+        metadata = {"affine": affine}
+        if "roi_offset" in meta:
+            metadata["roi_offset"] = meta["roi_offset"]
+        return {
+            "name": f"{layer_block.name} - {index} - {file_name}",
+            "data": data,
+            "affine": affine_to_use,
+            "metadata": metadata,
+        }
+
+    def apply_updates(self, updates):
+        """Update all layers of a case in one go and reset the camera once afterwards."""
+        render = {}
+        for layer_block, update, _, _ in updates:
+            start = perf_counter()
+            target_layer = [
+                layer
+                for layer in self.viewer.layers
+                if layer.name.startswith(f"{layer_block.name} - ")
+            ]
+            if len(target_layer) == 0:
+                layer_type = Image if layer_block.ltype == "Image" else Labels
+                self.viewer.add_layer(layer_type(**update))
             else:
-                return
-            self.viewer.add_layer(layer)
-        else:
-            target_layer = target_layer[0]
-            target_layer._keep_auto_contrast = get_value(self.auto_contrast)
-            target_layer.name = layer_name
-            target_layer.data = data
-            target_layer.affine = affine_to_use
-            target_layer.metadata = {"affine": affine}
-
-        if not get_value(self.keep_camera):
+                self.update_layer(target_layer[0], update)
+            render[layer_block.name] = perf_counter() - start
+
+        start = perf_counter()
+        if updates and not get_value(self.keep_camera):
             self.viewer.reset_view()
-            if self.viewer.layers[layer_name].ndim == 3:
+            layer = self.viewer.layers[updates[0][1]["name"]]
+            if layer.ndim == 3:
                 slice_axis = self.viewer.dims.order[0]
-                mid = self.viewer.layers[layer_name].data.shape[slice_axis] // 2
+                mid = layer.data.shape[slice_axis] // 2
                 current_step = list(self.viewer.dims.current_step)
                 current_step[slice_axis] = mid
                 self.viewer.dims.current_step = current_step
+        camera = perf_counter() - start
+
+        if self.recorder is not None:
+            for layer_block, _, cache, load in updates:
+                # the camera update is shared by all layers of the case
+                render_time = render[layer_block.name] + camera / len(updates)
+                self.recorder.record_layer(layer_block.name, cache, load, render_time)
+
+    def update_layer(self, layer, update):
+        """Set name, data, affine and metadata of a layer with a single refresh.
+
+        Each setter emits its own events and most of them refresh the layer, so all of them are
+        blocked while the layer is changed. Every event that was blocked is emitted once
+        afterwards, this includes the extent and dims events if the shape or ndim changed.
+        """
+        layer._keep_auto_contrast = get_value(self.auto_contrast)
+        with ExitStack() as stack:
+            blockers = {
+                name: stack.enter_context(emitter.blocker())
+                for name, emitter in layer.events.emitters.items()
+            }
+            layer.name = update["name"]
+            layer.metadata = update["metadata"]
+            # the data first, it adapts the ndim of the transforms the new affine is set on
+            layer.data = update["data"]
+            layer.affine = update["affine"]
+        # the extent first, the viewer has to adapt its dims before anything reacts to the data
+        extent_first = sorted(blockers, key=lambda name: name not in EXTENT_EVENTS)
+        for name in extent_first:
+            if blockers[name].count:
+                emitter = layer.events.emitters[name]
+                if name == "data":
+                    emitter(value=layer.data)
+                else:
+                    emitter()
+        layer.refresh()
@@ -14,7 +14,7 @@ from napari_toolkit.widgets import (
     setup_pushbutton,
     setup_spinbox,
 )
-from qtpy.QtWidgets import QSizePolicy, QVBoxLayout, QWidget
+from qtpy.QtWidgets import QAbstractItemView, QSizePolicy, QTableWidget, QVBoxLayout, QWidget
 
 from napari_data_inspection.widgets.layers_block_widget import setup_layerblock
 
@@ -32,6 +32,7 @@ class DataInspectionWidget_GUI(QWidget):
         self.index = 0
         self.layer_blocks = []
         self.meta_config = {}
+        self.project_path = None
 
         # Build Gui
         self.build_gui()
@@ -41,7 +42,12 @@ class DataInspectionWidget_GUI(QWidget):
 
         self.build_gui_header(main_layout)
         self.build_gui_navigation(main_layout)
+        self.build_gui_filter(main_layout)
         self.build_gui_prefetching(main_layout)
+        self.build_gui_validation(main_layout)
+        self.build_gui_statistics(main_layout)
+        self.build_gui_profiling(main_layout)
+        self.build_gui_snapshots(main_layout)
         self.build_gui_layers(main_layout)
 
         setup_acknowledgements(main_layout)
@@ -75,6 +81,45 @@ class DataInspectionWidget_GUI(QWidget):
         )
         hstack(_layout, [self.keep_camera, self.ignore_affine])
         self.auto_contrast = setup_checkbox(_layout, "Auto Contrast", True)
+        self.roi_ckbx = setup_checkbox(None, "Crop to Labels", False, function=self.on_roi_changed)
+        self.roi_ckbx.setToolTip("Only show the bounding box of the labels plus a margin")
+        label = setup_label(None, "Margin")
+        self.roi_margin = setup_spinbox(None, 0, 1000, default=10, function=self.on_roi_changed)
+        hstack(_layout, [self.roi_ckbx, label, self.roi_margin])
+        self.shuffle_ckbx = setup_checkbox(None, "Shuffle", False, function=self.on_shuffle_changed)
+        self.shuffle_ckbx.setToolTip("Walk through the cases in a seeded random order")
+        label = setup_label(None, "Seed")
+        self.shuffle_seed_spbx = setup_spinbox(
+            None, 0, 2**31 - 1, default=0, function=self.on_shuffle_changed
+        )
+        hstack(_layout, [self.shuffle_ckbx, label, self.shuffle_seed_spbx])
+        self.stream_ckbx = setup_checkbox(None, "Stream 4D", False, function=self.on_stream_changed)
+        self.stream_ckbx.setToolTip(
+            "Read 4D series frame by frame while moving the slider instead of loading them whole"
+        )
+        label = setup_label(None, "Frame Window")
+        self.frame_window = setup_spinbox(None, 0, 64, default=2, function=self.on_stream_changed)
+        self.frame_window.setToolTip("Frames prefetched ahead of the current one")
+        hstack(_layout, [self.stream_ckbx, label, self.frame_window])
+
+    def build_gui_filter(self, layout):
+        _container, _layout = setup_vgroupbox(layout, "Filter")
+        self.filter_ledt = setup_lineedit(
+            _layout,
+            placeholder="Filter, e.g. 3 in classes and 'bad' in flags",
+            function=self.on_filter_entered,
+        )
+        self.filter_ledt.setToolTip(
+            "Python expression evaluated per case, available names: index, name, classes, "
+            "shape, min_value, max_value, flags, mismatch, layers. Empty shows all cases."
+        )
+        self.filter_label = setup_label(_layout, "")
+        self.flag_ledt = setup_lineedit(
+            None, placeholder="QC Flag for this case", function=self.on_flag_entered
+        )
+        clear_flags_btn = setup_pushbutton(None, "Clear Flags", function=self.on_clear_flags)
+        hstack(_layout, [self.flag_ledt, clear_flags_btn])
+        self.flag_label = setup_label(_layout, "")
 
     def build_gui_prefetching(self, layout):
         _container, _layout = setup_vgroupbox(layout, "Prefetching")
@@ -88,11 +133,79 @@ class DataInspectionWidget_GUI(QWidget):
         label = setup_label(None, "Prefetch Radius")
         self.radius = setup_spinbox(None, 1, function=self.on_radius_changed)
         hstack(_layout, [label, self.radius])
+        label = setup_label(None, "Memory Limit (GB)")
+        self.memory_limit = setup_spinbox(
+            None, 0, 1024, default=0, function=self.on_memory_limit_changed
+        )
+        self.memory_limit.setToolTip(
+            "Throttle prefetching when the process RSS approaches this limit (0 = no limit)"
+        )
+        hstack(_layout, [label, self.memory_limit])
+        self.shared_cache_ckbx = setup_checkbox(
+            _layout, "Shared Cache", False, function=self.on_shared_cache_changed
+        )
+        self.shared_cache_ckbx.setToolTip(
+            "Share decoded images with your other viewers on this machine via shared memory"
+        )
+        self.memory_label = setup_label(_layout, "")
+
+    def build_gui_validation(self, layout):
+        _container, _layout = setup_vgroupbox(layout, "Validation")
+        validate_btn = setup_pushbutton(None, "Validate Headers", function=self.on_validate)
+        validate_btn.setToolTip("Compare shape and affine of all cases, reading only headers")
+        next_btn = setup_pushbutton(None, "Next Mismatch", function=self.on_next_mismatch)
+        hstack(_layout, [validate_btn, next_btn])
+        self.validation_label = setup_label(_layout, "")
+        self.validation_label.setWordWrap(True)
+
+    def build_gui_statistics(self, layout):
+        _container, _layout = setup_vgroupbox(layout, "Label Statistics")
+        self.stats_ckbx = setup_checkbox(
+            _layout, "Show Label Statistics", False, function=self.on_stats_changed
+        )
+        self.stats_table = QTableWidget(0, 5)
+        self.stats_table.setHorizontalHeaderLabels(
+            ["Layer", "Class", "Voxels", "Volume", "Components"]
+        )
+        self.stats_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.setVisible(False)
+        _layout.addWidget(self.stats_table)
+
+    def build_gui_profiling(self, layout):
+        _container, _layout = setup_vgroupbox(layout, "Profiling")
+        self.profiling_ckbx = setup_checkbox(
+            _layout, "Record Session", False, function=self.on_profiling_changed
+        )
+        self.profiling_ckbx.setToolTip(
+            "Record every navigation (cache hits, load and render times), the trace is written "
+            "when recording is switched off"
+        )
+        self.profile_cpu = setup_checkbox(None, "cProfile", False)
+        self.profile_memory = setup_checkbox(None, "tracemalloc", False)
+        hstack(_layout, [self.profile_cpu, self.profile_memory])
+        self.profiling_label = setup_label(_layout, "")
+
+    def build_gui_snapshots(self, layout):
+        _container, _layout = setup_vgroupbox(layout, "Snapshots")
+        render_btn = setup_pushbutton(None, "Render Snapshots", function=self.on_render_snapshots)
+        render_btn.setToolTip(
+            "Render mid-slices of every case with the labels overlaid to PNG files and a "
+            "contact sheet, following the current filter and order"
+        )
+        cancel_btn = setup_pushbutton(None, "Stop", function=self.on_stop_snapshots)
+        hstack(_layout, [render_btn, cancel_btn])
+        self.snapshot_label = setup_label(_layout, "")
 
     def build_gui_layers(self, layout):
         new_btn = setup_iconbutton(None, "New Layer", "add", function=self.on_new_layer)
         add_btn = setup_iconbutton(None, "Load All", "right_arrow", function=self.on_load_all)
-        _ = hstack(layout, [new_btn, add_btn])
+        cancel_btn = setup_iconbutton(None, "Cancel", "playback-stop", function=self.on_cancel_load)
+        cancel_btn.setToolTip(
+            "Stop scanning the layer directories, a directory listing that already runs "
+            "finishes in the background and is discarded"
+        )
+        _ = hstack(layout, [new_btn, add_btn, cancel_btn])
 
         # Scroll Area
         self.scroll_area = setup_scrollarea(layout)
@@ -131,6 +244,18 @@ class DataInspectionWidget_GUI(QWidget):
     def on_load_all(self):
         pass
 
+    def on_filter_entered(self):
+        pass
+
+    def on_flag_entered(self):
+        pass
+
+    def on_clear_flags(self):
+        pass
+
+    def on_cancel_load(self):
+        pass
+
     def on_new_layer(self):
         config = {"name": "", "path": "", "file_type": "", "type": "Image"}
         self.add_layer(config)
@@ -157,6 +282,33 @@ class DataInspectionWidget_GUI(QWidget):
     def on_change_affine(self):
         pass
 
+    def on_roi_changed(self):
+        pass
+
+    def on_shuffle_changed(self):
+        pass
+
+    def on_stream_changed(self):
+        pass
+
+    def on_validate(self):
+        pass
+
+    def on_next_mismatch(self):
+        pass
+
+    def on_stats_changed(self, state):
+        pass
+
+    def on_profiling_changed(self, state):
+        pass
+
+    def on_render_snapshots(self):
+        pass
+
+    def on_stop_snapshots(self):
+        pass
+
     # IO Events
     def load_project(self):
         pass
@@ -169,10 +321,26 @@ class DataInspectionWidget_GUI(QWidget):
         set_value(self.progressbar, self.index)
         set_value(self.project_name, "")
         set_value(self.search_name, "")
+        set_value(self.filter_ledt, "")
+        set_value(self.flag_ledt, "")
+        self.filter_label.setText("")
+        self.flag_label.setText("")
+        self.project_path = None
         set_value(self.keep_camera, False)
+        set_value(self.roi_ckbx, False)
+        set_value(self.roi_margin, 10)
+        set_value(self.shuffle_ckbx, False)
+        set_value(self.shuffle_seed_spbx, 0)
+        set_value(self.stream_ckbx, False)
+        set_value(self.frame_window, 2)
         set_value(self.prefetch_prev, True)
         set_value(self.prefetch_next, True)
         set_value(self.radius, 1)
+        set_value(self.memory_limit, 0)
+        self.validation_label.setText("")
+        self.validation_label.setToolTip("")
+        set_value(self.stats_ckbx, False)
+        self.stats_table.setRowCount(0)
 
     def on_prefetch_prev_changed(self, state):
         pass
@@ -182,3 +350,9 @@ class DataInspectionWidget_GUI(QWidget):
 
     def on_radius_changed(self, value):
         pass
+
+    def on_shared_cache_changed(self, state):
+        pass
+
+    def on_memory_limit_changed(self, value):
+        pass
@@ -1,14 +1,55 @@
+import os
+import threading
+from datetime import datetime
 from pathlib import Path
 
 from napari_toolkit.utils import get_value, set_value
 from omegaconf import OmegaConf
+from qtpy.QtCore import Signal
 from qtpy.QtWidgets import QFileDialog
 from vidata.config_manager import ConfigManager
 
+from napari_data_inspection.data_inspection._memory import system_memory
+from napari_data_inspection.data_inspection._profiling import SessionRecorder
+from napari_data_inspection.data_inspection._snapshot import render_snapshots
 from napari_data_inspection.data_inspection._widget_navigation import DataInspectionWidget_LC
+from napari_data_inspection.widgets.layers_block_widget import REGISTRY_MAPPING
 
 
 class DataInspectionWidget_IO(DataInspectionWidget_LC):
+    snapshot_progress = Signal(object)
+
+    def __init__(self, viewer):
+        super().__init__(viewer)
+        self._snapshot_run = 0
+        self.snapshot_progress.connect(self.on_snapshot_progress)
+
+    def project_config(self):
+        layer_configs = [layer_block.get_config() for layer_block in self.layer_blocks]
+
+        config = {
+            "name": get_value(self.project_name),
+            "layers": layer_configs,
+            "data_inspection": {
+                "keep_camera": get_value(self.keep_camera),
+                "crop_to_labels": get_value(self.roi_ckbx),
+                "crop_margin": get_value(self.roi_margin),
+                "shuffle": get_value(self.shuffle_ckbx),
+                "shuffle_seed": get_value(self.shuffle_seed_spbx),
+                "stream_frames": get_value(self.stream_ckbx),
+                "frame_window": get_value(self.frame_window),
+                # the case under review, restored on load
+                "index": int(self.current_index()),
+                "prefetch_prev": get_value(self.prefetch_prev),
+                "prefetch_next": get_value(self.prefetch_next),
+                "prefetch_radius": get_value(self.radius),
+                "memory_limit": get_value(self.memory_limit),
+            },
+        }
+
+        config.update(self.meta_config)
+        return config
+
     def save_project(self):
         if get_value(self.project_name) == "":
             print("Project name not set")
@@ -24,23 +65,8 @@ class DataInspectionWidget_IO(DataInspectionWidget_LC):
         )
         if config_path is not None and config_path.endswith(self.file_ending):
             config_path = Path(config_path)
-
-            layer_configs = [layer_block.get_config() for layer_block in self.layer_blocks]
-
-            config = {
-                "name": get_value(self.project_name),
-                "layers": layer_configs,
-                "data_inspection": {
-                    "keep_camera": get_value(self.keep_camera),
-                    "prefetch_prev": get_value(self.prefetch_prev),
-                    "prefetch_next": get_value(self.prefetch_next),
-                    "prefetch_radius": get_value(self.radius),
-                },
-            }
-
-            config.update(self.meta_config)
-
-            OmegaConf.save(config, config_path)
+            OmegaConf.save(self.project_config(), config_path)
+            self.project_path = config_path
         else:
             print("No Valid File Selected")
 
@@ -59,9 +85,11 @@ class DataInspectionWidget_IO(DataInspectionWidget_LC):
             print("No Valid File Selected")
 
     def _load_yaml_cfg(self, config_path, split=None, fold=None):
-        self.clear_project()
+        self.load_config(OmegaConf.load(config_path), split=split, fold=fold)
+        self.project_path = Path(config_path)
 
-        global_config = OmegaConf.load(config_path)
+    def load_config(self, global_config, split=None, fold=None):
+        self.clear_project()
 
         set_value(self.project_name, global_config["name"])
 
@@ -69,9 +97,17 @@ class DataInspectionWidget_IO(DataInspectionWidget_LC):
         data_inspection_config = data_inspection_config or {}
 
         set_value(self.keep_camera, data_inspection_config.get("keep_camera", False))
+        set_value(self.roi_ckbx, data_inspection_config.get("crop_to_labels", False))
+        set_value(self.roi_margin, data_inspection_config.get("crop_margin", 10))
+        set_value(self.shuffle_seed_spbx, data_inspection_config.get("shuffle_seed", 0))
+        set_value(self.shuffle_ckbx, data_inspection_config.get("shuffle", False))
+        set_value(self.frame_window, data_inspection_config.get("frame_window", 2))
+        set_value(self.stream_ckbx, data_inspection_config.get("stream_frames", False))
+        self.resume_index = data_inspection_config.get("index", None)
         set_value(self.prefetch_prev, data_inspection_config.get("prefetch_prev", True))
         set_value(self.prefetch_next, data_inspection_config.get("prefetch_next", True))
         set_value(self.radius, data_inspection_config.get("prefetch_radius", 1))
+        set_value(self.memory_limit, data_inspection_config.get("memory_limit", 0))
 
         exclude_layers = data_inspection_config.get("exclude_layers", [])
         exclude_layers = exclude_layers if isinstance(exclude_layers, list) else [exclude_layers]
@@ -81,7 +117,114 @@ class DataInspectionWidget_IO(DataInspectionWidget_LC):
                 self.add_layer(layer.config(split=split, fold=fold))
 
         self.update_max_len()
+        self.on_load_all()
 
         self.meta_config = {
             k: v for k, v in global_config.items() if k not in ["name", "layers", "data_inspection"]
         }
+
+    # Profiling
+    def on_profiling_changed(self, state):
+        if get_value(self.profiling_ckbx):
+            self.start_profiling()
+        else:
+            self.stop_profiling()
+
+    def start_profiling(self, profile_cpu=None, trace_memory=None):
+        """Start recording navigation events, returns the SessionRecorder."""
+        if self.recorder is None:
+            self.recorder = SessionRecorder(
+                project=OmegaConf.to_container(OmegaConf.create(self.project_config())),
+                profile_cpu=get_value(self.profile_cpu) if profile_cpu is None else profile_cpu,
+                trace_memory=(
+                    get_value(self.profile_memory) if trace_memory is None else trace_memory
+                ),
+            )
+            self.profiling_label.setText("Recording ...")
+        if not get_value(self.profiling_ckbx):
+            set_value(self.profiling_ckbx, True)
+        return self.recorder
+
+    def stop_profiling(self, path=None):
+        """Stop recording and dump the trace, returns its path (None if nothing was recorded)."""
+        recorder, self.recorder = self.recorder, None
+        if get_value(self.profiling_ckbx):
+            set_value(self.profiling_ckbx, False)
+        if recorder is None:
+            return None
+        if path is None:
+            name = get_value(self.project_name) or "data_inspection"
+            path = Path.cwd() / f"{name}_{datetime.now():%Y%m%d-%H%M%S}.trace.json"
+        path = recorder.dump(path)
+        self.profiling_label.setText(f"Trace: {path.name} ({len(recorder.events)} events)")
+        self.profiling_label.setToolTip(str(path))
+        print(f"Profiling trace written to {path}")
+        return path
+
+    # Snapshots
+    def snapshot_cases(self):
+        """(index, name, layers) of every case in the current order, see render_snapshots."""
+        layer_blocks = [lb for lb in self.layer_blocks if len(lb)]
+        order = self.case_order if self.case_order is not None else range(self.num_cases())
+        return [
+            (
+                index,
+                self.case_name(index),
+                [
+                    (lb.name, str(lb[index]), REGISTRY_MAPPING[lb.ltype], lb.file_type, lb.backend)
+                    for lb in layer_blocks
+                ],
+            )
+            for index in order
+        ]
+
+    def on_render_snapshots(self):
+        if not self.num_cases():
+            self.snapshot_label.setText("No layers loaded")
+            return
+        out_dir = QFileDialog.getExistingDirectory(
+            self, "Select Output Directory", str(Path.cwd()), QFileDialog.DontUseNativeDialog
+        )
+        if not out_dir:
+            return
+        self.render_snapshots(out_dir)
+
+    def render_snapshots(self, out_dir, max_workers=None, memory_budget=None):
+        """Render all cases in the background, by default within the memory limit (or half of
+        the available memory) using half of the cores."""
+        cases = self.snapshot_cases()
+        if memory_budget is None:
+            limit = get_value(self.memory_limit) * 1024**3
+            memory_budget = limit if limit else system_memory()[0] // 2 or None
+        max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+
+        self._snapshot_run += 1
+        run = self._snapshot_run
+        self.snapshot_label.setText(f"Rendering {len(cases)} cases ...")
+
+        def _render():
+            try:
+                _, sheet = render_snapshots(
+                    cases,
+                    out_dir,
+                    max_workers=max_workers,
+                    memory_budget=memory_budget,
+                    progress=lambda done, total: self.snapshot_progress.emit((run, done, total)),
+                    should_stop=lambda: run != self._snapshot_run,
+                )
+                result = f"Snapshots written to {out_dir}" if sheet else "No snapshots written"
+            except Exception as e:  # noqa: BLE001
+                result = f"Snapshots failed: {e}"
+            self.snapshot_progress.emit((run, result, None))
+
+        threading.Thread(target=_render, daemon=True).start()
+
+    def on_snapshot_progress(self, progress):
+        run, done, total = progress
+        if run != self._snapshot_run:
+            return
+        self.snapshot_label.setText(done if total is None else f"Rendered {done} / {total} cases")
+
+    def on_stop_snapshots(self):
+        self._snapshot_run += 1
+        self.snapshot_label.setText("Stopped")
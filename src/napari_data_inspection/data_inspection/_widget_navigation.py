@@ -1,13 +1,45 @@
 import concurrent.futures
+import threading
 from concurrent.futures import CancelledError
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import numpy as np
 from napari_toolkit.utils import get_value, set_value
+from qtpy.QtCore import QTimer, Signal
 from qtpy.QtGui import QKeySequence
-from qtpy.QtWidgets import QShortcut
-
+from qtpy.QtWidgets import QShortcut, QTableWidgetItem
+
+from napari_data_inspection.data_inspection._case_filter import (
+    DECODE_FIELDS,
+    HEADER_FIELDS,
+    ReviewLog,
+    case_namespace,
+    compile_filter,
+    evaluate_filter,
+    file_metadata,
+    required_fields,
+)
+from napari_data_inspection.data_inspection._frames import FRAME_BACKENDS
+from napari_data_inspection.data_inspection._header_io import read_header, validate_cases
+from napari_data_inspection.data_inspection._inflight import InflightRegistry
+from napari_data_inspection.data_inspection._label_stats import label_statistics
+from napari_data_inspection.data_inspection._memory import (
+    format_bytes,
+    nbytes,
+    process_rss,
+    system_memory,
+)
+from napari_data_inspection.data_inspection._roi import (
+    crop_to_bbox,
+    foreground_bbox,
+    union_bboxes,
+)
+from napari_data_inspection.data_inspection._shared_cache import (
+    DEFAULT_SIZE,
+    SharedArrayCache,
+    shared_key,
+)
 from napari_data_inspection.data_inspection._widget_gui import DataInspectionWidget_GUI
 
 if TYPE_CHECKING:
@@ -15,17 +47,43 @@ if TYPE_CHECKING:
 
 
 class DataInspectionWidget_LC(DataInspectionWidget_GUI):
+    validation_finished = Signal(object)
+    filter_finished = Signal(object)
+
     def __init__(self, viewer: "napari.viewer.Viewer"):
         super().__init__(viewer)
 
         # how many items on each side to cache
         self.cache_radius = 1
+        # radius actually used, shrinks below cache_radius under memory pressure
+        self.prefetch_radius = 1
+        # fraction of system memory that has to stay available before prefetching pauses
+        self.min_available_fraction = 0.1
+        # fraction of the memory limit at which the prefetch radius starts to shrink
+        self.throttle_fraction = 0.8
 
         self.cache_data = {}
         self.cache_meta = {}
 
         self._cache_futures = {}
         self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        # shared between all layer blocks, so the same file is never decoded twice at once
+        self._inflight = InflightRegistry(self._executor)
+        # speculative loads (e.g. search results) run on their own worker and never delay the
+        # regular prefetching
+        self._speculative_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        # decodes the layers of the case navigated to concurrently, apart from the prefetch queue
+        self._navigation_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        # cases waiting for their cache misses, see load_case
+        self._loads = set()
+        # a step arrived while a case was loading, only the latest case is loaded afterwards
+        self._refresh_queued = False
+        self.speculative_indices = set()
+        # search results are prefetched once the query narrows to this many matches
+        self.search_prefetch_limit = 3
+        # cross-process cache shared with other viewers, None if disabled
+        self.shared_cache = None
+        self.shared_cache_size = DEFAULT_SIZE
 
         # Key bindings …
         key_d = QShortcut(QKeySequence("d"), self)
@@ -35,9 +93,136 @@ class DataInspectionWidget_LC(DataInspectionWidget_GUI):
         key_a.activated.connect(self.progressbar.decrement_value)
         self.progressbar.prev_button.setToolTip("Press [a] for previous")
 
+        # incremental search, debounced so typing does not scan the file lists on every key
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self.on_search_changed)
+        self.search_name.textChanged.connect(lambda _: self._search_timer.start())
+
+        self._memory_timer = QTimer(self)
+        self._memory_timer.timeout.connect(self.on_memory_timer)
+        self._memory_timer.start(1000)
+
+        # crop to labels, plain attributes as they are read on the worker threads
+        self.roi_mode = False
+        self.roi_margin_value = 10
+        # file -> foreground box of a labels file, index -> union of all labels layers of a case
+        self.foreground_bboxes = {}
+        self.case_bboxes = {}
+
+        # index -> list of header mismatches found by the last validation
+        self.mismatched_cases = {}
+        self._validation_run = 0
+        self.validation_finished.connect(self.on_validation_finished)
+
+        # progressbar position -> case index, None if all cases are shown in order
+        self.case_order = None
+        self._case_positions = None
+        # matching cases of the filter and the seed of the shuffled order (None if not shuffled)
+        self.filter_order = None
+        self.shuffle_seed = None
+        # number of cases case_order was computed for
+        self._order_cases = 0
+        # case to show once all layers are scanned, restored from the project
+        self.resume_index = None
+        self.case_filter = None
+        # (file, labels) -> metadata used by filter expressions, filled whenever a file is
+        # decoded, images and labels of the same file have different metadata
+        self.file_metadata = {}
+        self._filter_run = 0
+        self._review_log = None
+        self.filter_finished.connect(self.on_filter_finished)
+
+        # label statistics, computed on the workers while stats_mode is on
+        self.stats_mode = False
+        # file -> {class: {"voxels", "volume", "components"}}
+        self.label_stats = {}
+
+        # SessionRecorder while profiling
+        self.recorder = None
+
+        # 4D files are read frame by frame while stream_mode is on
+        self.stream_mode = False
+        self.frame_window_value = 2
+        self.frame_cache_size = 16
+        # file -> whether it is 4D and its backend can read single frames
+        self._streamable = {}
+
     def on_index_changed(self):
         self.refresh()
 
+    # Case Order
+    def num_cases(self):
+        layer_lengths = [len(b) for b in self.layer_blocks if len(b) > 0]
+        return min(layer_lengths) if layer_lengths else 0
+
+    def num_positions(self):
+        return len(self.case_order) if self.case_order is not None else self.num_cases()
+
+    def position_to_index(self, position):
+        if self.case_order is None:
+            return position
+        return self.case_order[position] if 0 <= position < len(self.case_order) else None
+
+    def index_to_position(self, index):
+        if self.case_order is None:
+            return index
+        return self._case_positions.get(index)
+
+    def current_index(self):
+        index = self.position_to_index(get_value(self.progressbar))
+        return self.index if index is None else index
+
+    def set_index(self, index):
+        position = self.index_to_position(index)
+        if position is None:
+            # not part of the current subset, show all cases again
+            set_value(self.filter_ledt, "")
+            self.set_case_order(None)
+            position = index
+        set_value(self.progressbar, position)
+
+    def navigate_to(self, index):
+        """Show case index, refreshes even if it is shown already."""
+        if index == self.current_index():
+            self.refresh()
+        else:
+            self.set_index(index)
+
+    def set_case_order(self, order):
+        """Restrict navigation to the cases in order (None for all), shuffled if enabled."""
+        current = self.current_index()
+        self.filter_order = list(order) if order is not None else None
+        self._compute_case_order(self.num_cases())
+        position = self.index_to_position(current)
+        self.update_max_len(position if position is not None else 0)
+        if self.num_cases():
+            self.refresh()
+
+    def _compute_case_order(self, num_cases):
+        order = self.filter_order
+        if self.shuffle_seed is not None and num_cases:
+            # permute all cases and keep the filtered ones, so the shuffled order of the
+            # remaining cases does not change with the filter
+            permutation = np.random.default_rng(self.shuffle_seed).permutation(num_cases)
+            if order is not None:
+                keep = set(order)
+                permutation = [i for i in permutation if i in keep]
+            order = [int(i) for i in permutation]
+        self.case_order = order
+        self._case_positions = (
+            {index: position for position, index in enumerate(order)} if order is not None else None
+        )
+        self._order_cases = num_cases
+
+    def on_shuffle_changed(self):
+        seed = get_value(self.shuffle_seed_spbx) if get_value(self.shuffle_ckbx) else None
+        if seed == self.shuffle_seed:
+            return
+        self.shuffle_seed = seed
+        self.set_case_order(self.filter_order)
+
     def on_change_affine(self):
         for layer in self.viewer.layers:
             if get_value(self.ignore_affine):
@@ -46,44 +231,97 @@ class DataInspectionWidget_LC(DataInspectionWidget_GUI):
                 affine_to_use = layer.metadata.get("affine")
             layer.affine = affine_to_use
 
+    def on_roi_changed(self):
+        self.roi_mode = get_value(self.roi_ckbx)
+        self.roi_margin_value = get_value(self.roi_margin)
+        # the cache and the running prefetches hold crops of the previous setting
+        self.cache_data = {}
+        self.cache_meta = {}
+        running, self._cache_futures = self._cache_futures, {}
+        for futures in running.values():
+            for key, future in list(futures.values()):
+                self._inflight.release(key, future)
+        if any(len(lb) for lb in self.layer_blocks):
+            self.refresh()
+
+    def on_stream_changed(self):
+        self.stream_mode = get_value(self.stream_ckbx)
+        self.frame_window_value = get_value(self.frame_window)
+        # cached series were loaded with the previous setting
+        self.cache_data = {}
+        self.cache_meta = {}
+        if any(len(lb) for lb in self.layer_blocks):
+            self.refresh()
+
+    def is_streamed(self, layer_block, file):
+        """True if file is shown frame by frame, decided from its header once per file."""
+        if not self.stream_mode or file is None or layer_block.backend not in FRAME_BACKENDS:
+            return False
+        if str(file) not in self._streamable:
+            try:
+                header = read_header(str(file), layer_block.backend)
+            except Exception:  # noqa: BLE001
+                header = None
+            ndim = len(header["shape"]) if header is not None else 0
+            self._streamable[str(file)] = ndim >= 4
+        return self._streamable[str(file)]
+
+    def search_matches(self, query, limit=None):
+        """Indices of the files containing query, of the first layer with any match."""
+        for layer_block in self.layer_blocks:
+            matches = layer_block.files.search(query, limit)
+            if matches:
+                return matches
+        return []
+
     def on_name_entered(self):
         _name = get_value(self.search_name)
-        for layer_block in self.layer_blocks:
-            files = [str(_file).replace(layer_block.path, "") for _file in layer_block.files]
-            idx = next((i for i, f in enumerate(files) if _name in f), None)
-            if idx is not None:
-                set_value(self.progressbar, idx)
-                set_value(self.search_name, "")
-                break
+        matches = self.search_matches(_name, 1)
+        if matches:
+            self.set_index(matches[0])
+            set_value(self.search_name, "")
+
+    def on_search_changed(self):
+        query = get_value(self.search_name)
+        limit = self.search_prefetch_limit
+        matches = self.search_matches(query, limit + 1) if query else []
+        self.speculative_prefetch(matches if len(matches) <= limit else [])
 
     ###########################################################################################
 
     def on_load_all(self):
+        # scan all layers concurrently, each block emits loaded as soon as its files are known
+        for layer_block in self.layer_blocks:
+            layer_block.refresh_async()
+
+    def on_cancel_load(self):
         for layer_block in self.layer_blocks:
-            layer_block.refresh()
+            layer_block.cancel_refresh()
 
     # Layer Events
     def on_layer_loaded(self, layer_block):
+        if self.resume_index is not None and not any(lb.scanning for lb in self.layer_blocks):
+            index, self.resume_index = self.resume_index, None
+            self.update_max_len()
+            if 0 < index < self.num_cases():
+                self.navigate_to(index)
+                return
         if self.index < len(layer_block) and len(layer_block) != 0:
+            self.case_bboxes = {}
             self.update_max_len()
             self.refresh_layer(layer_block, self.index)
-
-            if get_value(self.prefetch_next):
-                for offset in range(1, self.cache_radius + 1):
-                    self.fill_cache(layer_block, self.index + offset)
-            if get_value(self.prefetch_prev):
-                for offset in range(1, self.cache_radius + 1):
-                    self.fill_cache(layer_block, self.index - offset)
+            self.prefetch(self.index, [layer_block])
 
     def on_layer_removed(self, block):
         super().on_layer_removed(block)
         self.update_max_len()
 
     def on_layer_updated(self, layer_block):
+        self.case_bboxes = {}
         self.update_max_len()
 
     # Functions
-    def update_max_len(self):
+    def update_max_len(self, position=None):
         layer_lengths = [len(b) for b in self.layer_blocks]
         if any(x != layer_lengths[0] and x != 0 for x in layer_lengths):
             print("Layer lengths do not match")
@@ -96,40 +334,63 @@ class DataInspectionWidget_LC(DataInspectionWidget_GUI):
             return
 
         min_len = np.min([_l for _l in layer_lengths if _l > 0])
-        if min_len != self.progressbar.max_value:
+        if min_len != self._order_cases:
+            # the layers changed below the filtered or shuffled order
+            current = self.current_index()
+            if self.filter_order is not None and any(i >= min_len for i in self.filter_order):
+                self.filter_order = None
+            self._compute_case_order(min_len)
+            if position is None and self.case_order is not None:
+                position = self.index_to_position(min(current, min_len - 1))
+        max_value = self.num_positions() - 1
+        if max_value != self.progressbar.max_value or position is not None:
             self.progressbar.index_changed.disconnect(self.on_index_changed)
-            self.progressbar.setMaximum(min_len - 1)
-            self.index = get_value(self.progressbar)
+            self.progressbar.setMaximum(max_value)
+            if position is not None:
+                set_value(self.progressbar, position)
+            self.index = self.current_index()
             self.progressbar.index_changed.connect(self.on_index_changed)
 
     # Data Loading
+    @property
+    def loading(self):
+        return bool(self._loads)
+
     def refresh(self):
-        idx = get_value(self.progressbar)
+        if self.loading:
+            # e.g. key repeat, the steps in between are dropped instead of decoded one by one
+            self._refresh_queued = True
+            return
+        idx = self.current_index()
+        if self.recorder is not None:
+            self.recorder.begin(idx)
         self._prune_caches_and_futures(idx)
 
-        for lb in self.layer_blocks:
-            if len(lb):
-                self.refresh_layer(lb, idx)
+        layer_blocks = [lb for lb in self.layer_blocks if len(lb)]
+        # if we came straight from adjacent index, push that into cache
+        if self.index in self.prefetch_indices(idx):
+            for lb in layer_blocks:
+                self.push_data_to_cache(lb, self.index)
+        # all layers are updated together, not one redraw per layer
+        self.load_case(layer_blocks, idx, on_loaded=self.on_case_loaded)
+
+    def on_case_loaded(self, index):
+        if self.recorder is not None:
+            self.recorder.end()
+        self.index = index
+        if self._refresh_queued:
+            # the next case is loaded right away, prefetch around that one
+            return
 
-        if get_value(self.prefetch_next):
-            for lb in self.layer_blocks:
-                for offset in range(1, self.cache_radius + 1):
-                    self.fill_cache(lb, idx + offset)
-        if get_value(self.prefetch_prev):
-            for lb in self.layer_blocks:
-                for offset in range(1, self.cache_radius + 1):
-                    self.fill_cache(lb, idx - offset)
+        self.prefetch(index)
 
-        self.index = idx
+        self.update_memory_stats()
+        self.update_flag_label()
+        self.update_stats_table()
 
     def refresh_layer(self, layer_block, index):
         # if we came straight from adjacent index, push that into cache
-        if (
-            index + 1 == self.index
-            and get_value(self.prefetch_next)
-            or index - 1 == self.index
-            and get_value(self.prefetch_prev)
-        ):
+        if self.index in self.prefetch_indices(index):
             self.push_data_to_cache(layer_block, self.index)
 
         if len(layer_block):
@@ -139,6 +400,12 @@ class DataInspectionWidget_LC(DataInspectionWidget_GUI):
         print(f"Refresh Layer {layer_block.name} at Index {index}")
         # … your existing loading logic …
 
+    def load_case(self, layer_blocks, index, on_loaded=None):
+        for layer_block in layer_blocks:
+            self.load_data(layer_block, index)
+        if on_loaded is not None:
+            on_loaded(index)
+
     def push_data_to_cache(self, layer_block, index):
         name = layer_block.name
         idx = str(index)
@@ -152,12 +419,194 @@ class DataInspectionWidget_LC(DataInspectionWidget_GUI):
             layer_name = f"{name} - {index} - {file_name}"
             if layer_name in self.viewer.layers:
                 self.cache_data[name][idx] = self.viewer.layers[layer_name].data
-                self.cache_meta[name][idx] = {
-                    "affine": self.viewer.layers[layer_name].metadata["affine"]
-                }
+                self.cache_meta[name][idx] = dict(self.viewer.layers[layer_name].metadata)
+
+    def _decode(self, loader, file, labels):
+        """Load a file, runs on the prefetch and navigation workers."""
+        shared_cache = self.shared_cache
+        # shared arrays are read-only, labels have to stay writable for painting
+        if shared_cache is None or labels:
+            data, meta = loader(file)
+        else:
+            key = shared_key(loader, file)
+            shared = shared_cache.get(key)
+            if shared is None:
+                # decode once per machine, the returned array maps the shared segment
+                data, meta = shared_cache.put(key, *loader(file))
+            else:
+                data, meta = shared
+        if labels:
+            self.on_labels_decoded(file, data, meta)
+        if self.case_filter is not None and (str(file), labels) not in self.file_metadata:
+            self.file_metadata[(str(file), labels)] = file_metadata(data, labels)
+        return data, meta
+
+    def decode(self, layer_block, index):
+        """Load the file of layer_block at index, sharing an in-flight decode of it."""
+        file = layer_block[index]
+        if self.is_streamed(layer_block, file):
+            frames = layer_block.load_frames(file, self.frame_cache_size, self.frame_window_value)
+            if frames is not None:
+                return frames
+        key, function, args = self.load_job(layer_block, index)
+        return self._inflight.run(key, function, *args)
+
+    def load_job(self, layer_block, index):
+        """(key, function, args) of the decode of layer_block at index for the inflight registry.
+
+        In ROI mode the worker also crops the data to the foreground of the case, so the cache
+        holds the crop. The crop depends on the case and the margin, both are part of the key.
+        """
+        file = layer_block[index]
+        key = layer_block.load_key(file)
+        labels = layer_block.ltype == "Labels"
+        if not self.roi_mode:
+            return key, self._decode, (key[1], file, labels)
+        # read here, the workers must not touch Qt objects
+        label_files = [
+            (lb.load_key(lb[index]), lb[index])
+            for lb in self.layer_blocks
+            # a streamed series is never decoded as a whole, so it has no box
+            if lb.ltype == "Labels"
+            and lb[index] is not None
+            and not self.is_streamed(lb, lb[index])
+        ]
+        margin = self.roi_margin_value
+        args = (key, file, labels, index, label_files, margin)
+        return (*key, index, margin), self._decode_cropped, args
+
+    def _decode_cropped(self, key, file, labels, index, label_files, margin):
+        """Decode a file and crop it to the foreground of its case, runs on the workers."""
+        data, meta = self._inflight.run(key, self._decode, key[1], file, labels)
+        bbox = self.case_bbox(index, label_files)
+        result = None if bbox is None else crop_to_bbox(data, meta.get("affine"), bbox, margin)
+        if result is None:
+            return data, meta
+        data, affine, offset = result
+        return data, {**meta, "affine": affine, "roi_offset": offset}
+
+    def on_labels_decoded(self, file, data, meta):
+        # runs on the worker right after decoding, where the mask is at hand anyway
+        if self.roi_mode and str(file) not in self.foreground_bboxes:
+            self.foreground_bboxes[str(file)] = foreground_bbox(data)
+        if self.stats_mode and str(file) not in self.label_stats:
+            self.label_stats[str(file)] = label_statistics(data, meta.get("affine"))
+
+    def case_bbox(self, index, label_files):
+        """Union of the foreground boxes of all labels layers of a case, cached per case.
+
+        Runs on the workers, labels without a box yet are decoded through the inflight
+        registry, so the decode is shared with the labels layer's own job.
+        """
+        if index in self.case_bboxes:
+            return self.case_bboxes[index]
+        bboxes = []
+        for key, file in label_files:
+            if str(file) not in self.foreground_bboxes:
+                self._inflight.run(key, self._decode, key[1], file, True)
+            bboxes.append(self.foreground_bboxes.get(str(file)))
+        bbox = union_bboxes(bboxes)
+        self.case_bboxes[index] = bbox
+        return bbox
+
+    # Prefetching
+    def prefetch_indices(self, index):
+        """Indices to prefetch around index, nearest first, following the case order."""
+        position = self.index_to_position(index)
+        if position is None:
+            return []
+        num_positions = self.num_positions()
+        indices = []
+        for offset in range(1, self.prefetch_radius + 1):
+            if get_value(self.prefetch_next) and position + offset < num_positions:
+                indices.append(self.position_to_index(position + offset))
+            if get_value(self.prefetch_prev) and position - offset >= 0:
+                indices.append(self.position_to_index(position - offset))
+        return indices
+
+    def prefetch(self, index, layer_blocks=None):
+        self._throttle_prefetch(index)
+        layer_blocks = self.layer_blocks if layer_blocks is None else layer_blocks
+        # labels first, in ROI mode the other layers of the case wait for their boxes
+        layer_blocks = sorted(layer_blocks, key=lambda lb: lb.ltype != "Labels")
+        for idx in self.prefetch_indices(index):
+            for lb in layer_blocks:
+                self.fill_cache(lb, idx)
+
+    def speculative_prefetch(self, indices):
+        """Load indices at low priority, replaces the previous speculative indices."""
+        stale = self.speculative_indices - set(indices)
+        self.speculative_indices = set(indices)
+        if stale:
+            self._prune_caches_and_futures(self.current_index())
+        if not indices or self._memory_pressure():
+            return
+        layer_blocks = sorted(self.layer_blocks, key=lambda lb: lb.ltype != "Labels")
+        for idx in indices:
+            for lb in layer_blocks:
+                self.fill_cache(lb, idx, executor=self._speculative_executor)
+
+    def _memory_pressure(self):
+        """0: no pressure, 1: shrink the prefetch radius, 2: release caches and pause."""
+        rss = process_rss()
+        available, total = system_memory()
+        limit = get_value(self.memory_limit) * 1024**3
+
+        if (limit and rss > limit) or (total and available < self.min_available_fraction * total):
+            return 2
+        if (limit and rss > self.throttle_fraction * limit) or (
+            total and available < 2 * self.min_available_fraction * total
+        ):
+            return 1
+        return 0
+
+    def _throttle_prefetch(self, current_idx):
+        pressure = self._memory_pressure()
+        if pressure == 0:
+            self.prefetch_radius = self.cache_radius
+            return
+
+        radius = min(self.prefetch_radius, max(1, self.cache_radius // 2))
+        if radius < self.prefetch_radius:
+            self.prefetch_radius = radius
+            self._prune_caches_and_futures(current_idx)
+            pressure = self._memory_pressure()
+
+        # release the remaining cache tiers ring by ring, farthest first
+        while pressure == 2 and self.prefetch_radius > 0:
+            self.prefetch_radius -= 1
+            self._prune_caches_and_futures(current_idx)
+            pressure = self._memory_pressure()
+
+    def on_memory_timer(self):
+        # also while idle, otherwise the caches are only released on the next navigation
+        if self.num_cases():
+            radius = self.prefetch_radius
+            index = self.current_index()
+            self._throttle_prefetch(index)
+            if self.prefetch_radius > radius:
+                # the pressure is gone, refill the rings released before
+                self.prefetch(index)
+        self.update_memory_stats()
+
+    def update_memory_stats(self):
+        cache_bytes = nbytes(self.cache_data)
+        layer_bytes = sum(nbytes(layer.data) for layer in self.viewer.layers)
+        text = (
+            f"Cache: {format_bytes(cache_bytes)} | Layers: {format_bytes(layer_bytes)}"
+            f" | RSS: {format_bytes(process_rss())}"
+        )
+        if self.shared_cache is not None:
+            count, shared_bytes = self.shared_cache.stats()
+            text += f" | Shared: {count} files, {format_bytes(shared_bytes)}"
+        if self.prefetch_radius == 0 and self.cache_radius > 0:
+            text += " (prefetch paused)"
+        elif self.prefetch_radius < self.cache_radius:
+            text += f" (radius {self.prefetch_radius})"
+        self.memory_label.setText(text)
 
     # New: schedules via Future instead of raw Thread
-    def fill_cache(self, layer_block, index):
+    def fill_cache(self, layer_block, index, executor=None):
         name = layer_block.name
         idx = str(index)
         if index < 0 or index >= len(layer_block):
@@ -173,12 +622,21 @@ class DataInspectionWidget_LC(DataInspectionWidget_GUI):
         # schedule the load - only if not already sheduled and data is not already in cache
         if str(idx) not in self._cache_futures[name] and str(idx) not in self.cache_data[name]:
             file = layer_block[index]
-            future = self._executor.submit(layer_block.load_data, file)
-            self._cache_futures[name][idx] = future
+            # frames of streamed series are prefetched by the series itself
+            if self.is_streamed(layer_block, file):
+                return
+            load_key, function, args = self.load_job(layer_block, index)
+            # attaches to an in-flight decode of the same file if there is one
+            future = self._inflight.submit(load_key, function, *args, executor=executor)
+            self._cache_futures[name][idx] = (load_key, future)
 
             def _on_done(fut, layer=name, key=idx):
                 try:
-                    if fut.cancelled():
+                    # cancelled, or released while running (e.g. the ROI setting changed)
+                    if fut.cancelled() or self._cache_futures.get(layer, {}).get(key) != (
+                        load_key,
+                        fut,
+                    ):
                         return
                     data, affine = fut.result()
                     self.cache_data[layer][key] = data
@@ -188,20 +646,16 @@ class DataInspectionWidget_LC(DataInspectionWidget_GUI):
                 except Exception as e:  # noqa: BLE001
                     print(f"Prefetch callback error for {layer}[{key}]: {e}")
                 finally:
-                    self._cache_futures[layer].pop(key, None)
+                    if self._cache_futures.get(layer, {}).get(key) == (load_key, fut):
+                        self._cache_futures[layer].pop(key, None)
 
             future.add_done_callback(_on_done)
 
     def _prune_caches_and_futures(self, current_idx):
 
         keep_indices = {str(current_idx)}
-        if get_value(self.prefetch_prev):
-            keep_indices.update(str(i) for i in range(current_idx - self.cache_radius, current_idx))
-
-        if get_value(self.prefetch_next):
-            keep_indices.update(
-                str(i) for i in range(current_idx + 1, current_idx + self.cache_radius + 1)
-            )
+        keep_indices.update(str(i) for i in self.prefetch_indices(current_idx))
+        keep_indices.update(str(i) for i in self.speculative_indices)
 
         valid_layers = {b.name for b in self.layer_blocks}
 
@@ -218,55 +672,311 @@ class DataInspectionWidget_LC(DataInspectionWidget_GUI):
         # cancel & prune futures
         for layer, fmap in list(self._cache_futures.items()):
             if layer not in valid_layers:
-                for fut in fmap.values():
-                    fut.cancel()
+                for key, fut in fmap.values():
+                    self._inflight.release(key, fut)
                 self._cache_futures.pop(layer, None)
                 continue
 
             # only keep those within keep_indices
             to_delete = [k for k in fmap if k not in keep_indices]
             for k in to_delete:
-                fut = self._cache_futures[layer].pop(k, None)
-                if fut:
-                    fut.cancel()
+                entry = self._cache_futures[layer].pop(k, None)
+                if entry:
+                    self._inflight.release(*entry)
 
     def closeEvent(self, event):
+        self._memory_timer.stop()
+        self.enable_shared_cache(False)
         self._executor.shutdown(wait=False)
+        self._speculative_executor.shutdown(wait=False, cancel_futures=True)
+        self._navigation_executor.shutdown(wait=False)
         super().closeEvent(event)
 
     def on_prefetch_prev_changed(self, state):
-        idx = get_value(self.progressbar)
+        idx = self.current_index()
         if state:
-            for lb in self.layer_blocks:
-                for offset in range(1, self.cache_radius + 1):
-                    self.fill_cache(lb, idx - offset)
+            self.prefetch(idx)
         else:
             self._prune_caches_and_futures(idx)
 
     def on_prefetch_next_changed(self, state):
-        idx = get_value(self.progressbar)
+        idx = self.current_index()
         if state:
-            for lb in self.layer_blocks:
-                for offset in range(1, self.cache_radius + 1):
-                    self.fill_cache(lb, idx + offset)
+            self.prefetch(idx)
         else:
             self._prune_caches_and_futures(idx)
 
     def on_radius_changed(self, value):
         self.cache_radius = value
-        idx = get_value(self.progressbar)
+        self.prefetch_radius = value
+        idx = self.current_index()
         self._prune_caches_and_futures(idx)
+        self.prefetch(idx)
+
+    def on_shared_cache_changed(self, state):
+        self.enable_shared_cache(get_value(self.shared_cache_ckbx))
+
+    def enable_shared_cache(self, enabled=True, max_bytes=None):
+        """Connect to (or start) the shared cache coordinator, max_bytes only applies to a new one."""
+        if max_bytes is not None:
+            self.shared_cache_size = max_bytes
+        if enabled and self.shared_cache is None:
+            try:
+                self.shared_cache = SharedArrayCache(max_bytes=self.shared_cache_size).connect()
+            except (ConnectionError, OSError) as e:
+                print(f"Shared cache not available: {e}")
+                enabled = False
+        elif not enabled and self.shared_cache is not None:
+            shared_cache, self.shared_cache = self.shared_cache, None
+            shared_cache.close()
+        if get_value(self.shared_cache_ckbx) != enabled:
+            set_value(self.shared_cache_ckbx, enabled)
+        self.update_memory_stats()
+
+    def on_memory_limit_changed(self, value):
+        idx = self.current_index()
+        self.prefetch_radius = self.cache_radius
+        self.prefetch(idx)
+        self.update_memory_stats()
+
+    # Validation
+    def on_validate(self):
+        layer_blocks = [lb for lb in self.layer_blocks if len(lb)]
+        if not layer_blocks:
+            self.validation_label.setText("No layers loaded")
+            return
+        # collect everything on the GUI thread, the worker must not touch Qt objects
+        # the file tables are immutable, the worker can read them directly
+        layers = [(lb.name, lb.files, lb.backend) for lb in layer_blocks]
+        num_cases = self.num_cases()
+
+        self._validation_run += 1
+        run = self._validation_run
+        self.validation_label.setText(f"Validating {num_cases} cases ...")
+
+        def _validate():
+            try:
+                result = validate_cases(
+                    layers, num_cases, should_stop=lambda: run != self._validation_run
+                )
+            except Exception as e:  # noqa: BLE001
+                print(f"Validation failed: {e}")
+                result = None
+            if run == self._validation_run:
+                self.validation_finished.emit(result)
+
+        threading.Thread(target=_validate, daemon=True).start()
+
+    def on_validation_finished(self, result):
+        if result is None:
+            self.validation_label.setText("Validation failed")
+            return
+        self.mismatched_cases = result
+        if not result:
+            self.validation_label.setText("All cases match")
+            return
+        indices = sorted(result)
+        shown = ", ".join(str(i) for i in indices[:20]) + (" ..." if len(indices) > 20 else "")
+        self.validation_label.setText(f"{len(indices)} mismatched cases: {shown}")
+        self.validation_label.setToolTip(
+            "\n".join(f"{i}: {'; '.join(result[i])}" for i in indices[:100])
+        )
+
+    def on_next_mismatch(self):
+        if not self.mismatched_cases:
+            return
+        # next mismatch in the current (possibly filtered) order
+        positions = sorted(
+            p for p in map(self.index_to_position, self.mismatched_cases) if p is not None
+        )
+        if not positions:
+            return
+        position = get_value(self.progressbar)
+        set_value(self.progressbar, next((p for p in positions if p > position), positions[0]))
 
-        if get_value(self.prefetch_next):
-            for lb in self.layer_blocks:
-                for offset in range(1, self.cache_radius + 1):
-                    self.fill_cache(lb, idx + offset)
-        if get_value(self.prefetch_prev):
+    # Filter
+    def case_name(self, index):
+        for lb in self.layer_blocks:
+            file = lb[index]
+            if file is not None:
+                return lb.fm.name_from_path(file, False)
+        return str(index)
+
+    def review_log(self):
+        if self.project_path is not None:
+            path = Path(self.project_path).with_suffix(".review.jsonl")
+        else:
+            path = Path.cwd() / f"{get_value(self.project_name) or 'data_inspection'}.review.jsonl"
+        if self._review_log is None or self._review_log.path != path:
+            self._review_log = ReviewLog(path)
+        return self._review_log
+
+    def on_filter_entered(self):
+        expression = get_value(self.filter_ledt).strip()
+        self._filter_run += 1
+        if expression == "":
+            self.case_filter = None
+            self.filter_label.setText("")
+            self.set_case_order(None)
+            return
+        try:
+            code = compile_filter(expression)
+        except ValueError as e:
+            self.filter_label.setText(str(e))
+            return
+        layer_blocks = [lb for lb in self.layer_blocks if len(lb)]
+        if not layer_blocks:
+            self.filter_label.setText("No layers loaded")
+            return
+        self.case_filter = code
+
+        # collect everything on the GUI thread, the workers must not touch Qt objects
+        fields = required_fields(code)
+        layers = [
+            (lb.name, lb.files, lb.loader(), lb.ltype == "Labels", lb.backend)
+            for lb in layer_blocks
+        ]
+        num_cases = self.num_cases()
+        # case_name of every case, decoded from the first table in one go
+        names = layer_blocks[0].files.names(False)[:num_cases]
+        flags = self.review_log().flags()
+        mismatched = set(self.mismatched_cases)
+        run = self._filter_run
+        self.filter_label.setText(f"Filtering {num_cases} cases ...")
+
+        def _case_matches(index):
+            if run != self._filter_run:
+                return False
+            layers_meta = {}
+            for name, files, loader, labels, backend in layers:
+                file = str(files[index])
+                meta = self.file_metadata.get((file, labels))
+                try:
+                    if meta is None and fields & HEADER_FIELDS and not fields & DECODE_FIELDS:
+                        # the shape is known from the header, no need to decode
+                        header = read_header(file, backend)
+                        meta = {"shape": header["shape"]} if header is not None else None
+                    if meta is None and fields & (DECODE_FIELDS | HEADER_FIELDS):
+                        # the fields need the data or the backend has no known header
+                        meta = file_metadata(loader(file)[0], labels)
+                        self.file_metadata[(file, labels)] = meta
+                except Exception:  # noqa: BLE001
+                    # an unreadable file does not match, it does not fail the whole filter
+                    meta = None
+                layers_meta[name] = meta or {}
+            namespace = case_namespace(
+                index, names[index], layers_meta, flags.get(names[index], ()), index in mismatched
+            )
+            return evaluate_filter(code, namespace)
+
+        def _filter():
+            try:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                    matches = list(executor.map(_case_matches, range(num_cases)))
+                order = [i for i, match in enumerate(matches) if match]
+            except Exception as e:  # noqa: BLE001
+                print(f"Filter failed: {e}")
+                order = None
+            if run == self._filter_run:
+                self.filter_finished.emit((order, num_cases))
+
+        threading.Thread(target=_filter, daemon=True).start()
+
+    def on_filter_finished(self, result):
+        order, num_cases = result
+        if order is None:
+            self.filter_label.setText("Filter failed")
+        elif len(order) == 0:
+            self.filter_label.setText(f"No matching cases (0 / {num_cases})")
+        else:
+            self.filter_label.setText(f"{len(order)} / {num_cases} cases")
+            self.set_case_order(order)
+
+    def on_flag_entered(self):
+        flag = get_value(self.flag_ledt).strip()
+        if flag == "" or not self.num_cases():
+            return
+        index = self.current_index()
+        self.review_log().add(index, self.case_name(index), flag)
+        set_value(self.flag_ledt, "")
+        self.update_flag_label()
+
+    def on_clear_flags(self):
+        if not self.num_cases():
+            return
+        index = self.current_index()
+        name = self.case_name(index)
+        review_log = self.review_log()
+        for flag in sorted(review_log.flags().get(name, ())):
+            review_log.remove(index, name, flag)
+        self.update_flag_label()
+
+    def update_flag_label(self):
+        if not self.num_cases():
+            self.flag_label.setText("")
+            return
+        flags = self.review_log().flags().get(self.case_name(self.current_index()), ())
+        self.flag_label.setText(f"Flags: {', '.join(sorted(flags))}" if flags else "")
+
+    # Label Statistics
+    def on_stats_changed(self, state):
+        self.stats_mode = get_value(self.stats_ckbx)
+        self.stats_table.setVisible(self.stats_mode)
+        self.update_stats_table()
+
+    def case_label_stats(self, layer_block, index):
+        file = layer_block[index]
+        if file is None:
+            return None
+        if str(file) not in self.label_stats:
+            # decoded before statistics were switched on, use the displayed data instead
+            layer_name = f"{layer_block.name} - {index} - {layer_block.fm.name_from_path(file)}"
+            if layer_name not in self.viewer.layers:
+                return None
+            layer = self.viewer.layers[layer_name]
+            self.label_stats[str(file)] = label_statistics(
+                np.asarray(layer.data), layer.metadata.get("affine")
+            )
+        return self.label_stats[str(file)]
+
+    def update_stats_table(self):
+        rows = []
+        if self.stats_mode and self.num_cases():
+            index = self.current_index()
             for lb in self.layer_blocks:
-                for offset in range(1, self.cache_radius + 1):
-                    self.fill_cache(lb, idx - offset)
+                if lb.ltype != "Labels" or not len(lb):
+                    continue
+                stats = self.case_label_stats(lb, index) or {}
+                for cls, s in sorted(stats.items()):
+                    components = "-" if s["components"] is None else str(s["components"])
+                    rows.append(
+                        [lb.name, str(cls), str(s["voxels"]), f"{s['volume']:.6g}", components]
+                    )
+
+        self.stats_table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, text in enumerate(row):
+                self.stats_table.setItem(r, c, QTableWidgetItem(text))
+        self.stats_table.resizeColumnsToContents()
 
     def clear_project(self):
+        self._validation_run += 1
+        self.label_stats = {}
+        self._filter_run += 1
+        self.case_bboxes = {}
+        self.case_order = None
+        self._case_positions = None
+        self.filter_order = None
+        self.shuffle_seed = None
+        self._order_cases = 0
+        self.resume_index = None
+        self.speculative_indices = set()
+        self._streamable = {}
+        self.case_filter = None
+        self.file_metadata = {}
+        self._review_log = None
+        self.mismatched_cases = {}
+        self.on_cancel_load()
         for layer_block in self.layer_blocks:
 
             file = layer_block[self.index]
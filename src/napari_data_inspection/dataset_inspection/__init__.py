@@ -1,6 +1,7 @@
 from .dataset_widget import (
+    DatasetBatchInspectionWidget,
     DatasetInspectionWidget,
     run_dataset_inspection,
 )
 
-__all__ = ("DatasetInspectionWidget", "run_dataset_inspection")
+__all__ = ("DatasetBatchInspectionWidget", "DatasetInspectionWidget", "run_dataset_inspection")
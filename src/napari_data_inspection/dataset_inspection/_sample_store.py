@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import pickle
+import random
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+
+INDEX_VERSION = 2
+
+
+def sample_seed(seed: int, index: int) -> int:
+    """Seed for drawing sample index, independent of the order the samples are visited in."""
+    return int(np.random.SeedSequence([seed, index]).generate_state(1)[0])
+
+
+def seed_everything(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.manual_seed(seed)
+
+
+# object reprs contain memory addresses, they change every session
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def dataset_fingerprint(dataset) -> str:
+    """Hash of the dataset class, its length and the reprs of its attributes.
+
+    The attributes include e.g. the transforms with their parameters, so changing the
+    augmentation changes the fingerprint. Reprs abbreviate large arrays, pass an explicit
+    fingerprint to the SampleStore if the data can change without any attribute changing.
+    """
+    cls = type(dataset)
+    try:
+        length = len(dataset)
+    except TypeError:
+        length = None
+    attributes = sorted((k, repr(v)) for k, v in getattr(dataset, "__dict__", {}).items())
+    text = _ADDRESS.sub("", repr((cls.__module__, cls.__qualname__, length, attributes)))
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def _is_array(part) -> bool:
+    return isinstance(part, np.ndarray) or hasattr(part, "detach")
+
+
+def _as_array(part):
+    if hasattr(part, "detach"):
+        return part.detach().cpu().numpy()
+    return np.asarray(part)
+
+
+class SampleStore:
+    """On-disk store of dataset samples keyed by (index, seed).
+
+    Array parts of a sample are written as one .npy file each and reopened memory-mapped,
+    everything else (e.g. a meta dict) is pickled. ``index.json`` maps every key to its files,
+    size and last access, the least recently used samples are removed once the store grows
+    beyond max_bytes. Stored and removed samples are appended to ``index.log`` and merged
+    into ``index.json`` on flush, so a put does not rewrite the whole index.
+
+    A store belongs to one dataset fingerprint (see `dataset_fingerprint`), samples stored
+    for another fingerprint are discarded when the store is opened.
+    """
+
+    def __init__(self, root, max_bytes: int | None = None, fingerprint: str | None = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint
+        self._index_file = self.root / "index.json"
+        self._log_file = self.root / "index.log"
+        self._index, stored_fingerprint = self._load()
+        self._logged = 0
+        self._dirty = False
+        if stored_fingerprint != fingerprint and self._index:
+            print(f"Samples in {self.root} were stored for another dataset, discarding them")
+            for key in list(self._index):
+                self._remove(key, log=False)
+        # merges the log and records the fingerprint
+        self.flush(force=True)
+
+    def _load(self):
+        index, fingerprint = {}, None
+        if self._index_file.is_file():
+            with open(self._index_file) as f:
+                state = json.load(f)
+            if state.get("version") == INDEX_VERSION:
+                index, fingerprint = state["samples"], state["fingerprint"]
+            else:
+                # stores without a fingerprint were a plain key -> entry mapping
+                index = state
+        if self._log_file.is_file():
+            with open(self._log_file) as f:
+                for line in f:
+                    try:
+                        key, entry = json.loads(line)
+                    except ValueError:
+                        # the line a crash interrupted
+                        break
+                    if entry is None:
+                        index.pop(key, None)
+                    else:
+                        index[key] = entry
+        return index, fingerprint
+
+    def _log(self, key, entry):
+        with open(self._log_file, "a") as f:
+            f.write(json.dumps([key, entry]) + "\n")
+        self._logged += 1
+
+    @staticmethod
+    def key(index: int, seed: int) -> str:
+        return f"{index}_{seed}"
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry["nbytes"] for entry in self._index.values())
+
+    def get(self, index: int, seed: int):
+        """Return the stored sample (arrays memory-mapped) or None."""
+        key = self.key(index, seed)
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        try:
+            parts = []
+            for kind, file in entry["parts"]:
+                if kind == "npy":
+                    parts.append(np.load(self.root / file, mmap_mode="r"))
+                else:
+                    with open(self.root / file, "rb") as f:
+                        parts.append(pickle.load(f))
+        except (OSError, ValueError, pickle.UnpicklingError) as e:
+            print(f"Stored sample {key} is broken, recomputing: {e}")
+            self._remove(key)
+            return None
+        entry["access"] = time.time()
+        self._dirty = True
+        return tuple(parts) if entry["tuple"] else parts[0]
+
+    def put(self, index: int, seed: int, sample):
+        """Store a sample, a tuple (image, label, meta, ...) or a single array."""
+        key = self.key(index, seed)
+        # the logged entry replaces the old one
+        self._remove(key, log=False)
+        is_tuple = isinstance(sample, tuple)
+        parts, nbytes = [], 0
+        for i, part in enumerate(sample if is_tuple else (sample,)):
+            if _is_array(part):
+                file = f"{key}_{i}.npy"
+                part = _as_array(part)
+                np.save(self.root / file, part)
+                parts.append(("npy", file))
+            else:
+                file = f"{key}_{i}.pkl"
+                with open(self.root / file, "wb") as f:
+                    pickle.dump(part, f)
+                parts.append(("pkl", file))
+            nbytes += (self.root / file).stat().st_size
+        self._index[key] = {
+            "parts": parts,
+            "tuple": is_tuple,
+            "nbytes": nbytes,
+            "access": time.time(),
+        }
+        self._log(key, self._index[key])
+        self._dirty = True
+        self._evict(keep=key)
+        if self._logged > max(len(self._index), 1000):
+            # keeps the log from growing beyond the index
+            self.flush()
+
+    def _remove(self, key, log=True):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        for _, file in entry["parts"]:
+            # memory-mapped parts stay readable until they are released (posix)
+            (self.root / file).unlink(missing_ok=True)
+        self._dirty = True
+        if log:
+            self._log(key, None)
+
+    def _evict(self, keep=None):
+        if self.max_bytes is None:
+            return
+        used = self.nbytes
+        for key in sorted(self._index, key=lambda k: self._index[k]["access"]):
+            if used <= self.max_bytes:
+                break
+            if key != keep:
+                used -= self._index[key]["nbytes"]
+                self._remove(key)
+
+    def flush(self, force=False):
+        """Write the index and empty the log.
+
+        The index is replaced atomically and the log only emptied afterwards, so a crash never
+        leaves a broken index behind or loses a stored sample.
+        """
+        if not (self._dirty or force):
+            return
+        tmp = self._index_file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(
+                {"version": INDEX_VERSION, "fingerprint": self.fingerprint, "samples": self._index},
+                f,
+            )
+        os.replace(tmp, self._index_file)
+        self._log_file.unlink(missing_ok=True)
+        self._logged = 0
+        self._dirty = False
+
+    def clear(self):
+        for key in list(self._index):
+            self._remove(key, log=False)
+        self.flush(force=True)
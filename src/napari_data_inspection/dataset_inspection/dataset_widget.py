@@ -1,3 +1,8 @@
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 import napari
@@ -17,11 +22,24 @@ from napari_toolkit.widgets import (
 from qtpy.QtGui import QKeySequence
 from qtpy.QtWidgets import QShortcut, QSizePolicy, QVBoxLayout, QWidget
 from napari.utils.colormaps import label_colormap
+from napari.utils.notifications import show_error
+
+from napari_data_inspection.dataset_inspection._sample_store import (
+    SampleStore,
+    dataset_fingerprint,
+    sample_seed,
+    seed_everything,
+)
 
 if TYPE_CHECKING:
     import torch
 
 
+def _is_sample_tuple(data) -> bool:
+    # (image, label, meta, ...) samples, default_collate turns the tuples into lists
+    return isinstance(data, Sequence) and not isinstance(data, (str, bytes))
+
+
 class DatasetInspectionWidget(QWidget):
 
     def __init__(
@@ -32,6 +50,10 @@ class DatasetInspectionWidget(QWidget):
         rescale: bool = False,
         no_label: bool = False,
         bg_class: int = 0,
+        seed: int | None = None,
+        store: str | None = None,
+        store_size: float | None = None,
+        store_fingerprint: str | None = None,
     ):
         super().__init__()
         self.viewer = viewer
@@ -44,6 +66,15 @@ class DatasetInspectionWidget(QWidget):
         self.no_label = no_label
         self.bg_class = bg_class
 
+        # samples are drawn with a fixed seed per (index, seed) and optionally kept on disk
+        self.seed = seed if seed is not None or store is None else 0
+        max_bytes = int(store_size * 1024**3) if store_size is not None else None
+        self.store = None
+        if store is not None:
+            # samples of another dataset or augmentation must not be served from the store
+            fingerprint = store_fingerprint or dataset_fingerprint(dataset)
+            self.store = SampleStore(store, max_bytes, fingerprint)
+
         self.img_layer = None
         self.label_layer = None
 
@@ -66,14 +97,20 @@ class DatasetInspectionWidget(QWidget):
         main_layout = QVBoxLayout()
 
         self.build_gui_navigation(main_layout)
+        self.build_gui_samples(main_layout)
         setup_acknowledgements(main_layout)
 
         self.setLayout(main_layout)
 
     def build_gui_navigation(self, layout):
         _container, _layout = setup_vgroupbox(layout, "Navigation")
+        num_items = self.num_items()
         self.progressbar = setup_progressbaredit(
-            _layout, 0, len(self.dataset), self.index, function=self.on_index_changed
+            _layout,
+            0,
+            num_items if num_items is not None else 1,
+            self.index,
+            function=self.on_index_changed,
         )
         self.progressbar.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Fixed)
 
@@ -92,16 +129,24 @@ class DatasetInspectionWidget(QWidget):
 
         _ = setup_pushbutton(_layout, "Refresh", self.on_index_changed)
 
-    def on_index_changed(self):
-        index = get_value(self.progressbar)
-        data = self.dataset[index]
+    def num_items(self):
+        return len(self.dataset)
 
-        img = data[0] if isinstance(data, tuple) else data
-        lbl = data[1] if isinstance(data, tuple) and not get_value(self.no_label_ckbx) else None
-        meta = data[2] if isinstance(data, tuple) and len(data) > 2 else None
-        name = meta["file_name"] if isinstance(meta, dict) and "file_name" in meta else index
+    def build_gui_samples(self, layout):
+        _container, _layout = setup_vgroupbox(layout, "Samples")
+        self.seed_ckbx = setup_checkbox(
+            None, "Fixed Seed", self.seed is not None, self.on_index_changed
+        )
+        self.seed_ckbx.setToolTip("Draw every sample with a seed derived from (index, seed)")
+        self.seed_spin_box = setup_spinbox(
+            None, 0, 2**31 - 1, default=self.seed or 0, function=self.on_index_changed
+        )
+        hstack(_layout, [self.seed_ckbx, self.seed_spin_box])
+        self.store_label = setup_label(_layout, "")
 
-        img = np.array(img) if not isinstance(img, np.ndarray) else img
+    def on_index_changed(self):
+        index = get_value(self.progressbar)
+        img, lbl, name = self.unpack(self.get_item(index), index)
 
         if get_value(self.channel_first_ckbx):
             img = img.transpose(1, 2, 0)
@@ -110,6 +155,35 @@ class DatasetInspectionWidget(QWidget):
             img = img - np.min(img)
             img = img / np.max(img)
 
+        self.show(img, lbl, name)
+
+    def get_item(self, index):
+        if not get_value(self.seed_ckbx):
+            return self.dataset[index]
+        seed = get_value(self.seed_spin_box)
+        data = self.store.get(index, seed) if self.store is not None else None
+        if data is None:
+            seed_everything(sample_seed(seed, index))
+            data = self.dataset[index]
+            if self.store is not None:
+                self.store.put(index, seed, data)
+        if self.store is not None:
+            self.store_label.setText(
+                f"Store: {len(self.store)} samples, {self.store.nbytes / 1024**2:.1f} MB"
+            )
+        return data
+
+    def unpack(self, data, index):
+        is_tuple = _is_sample_tuple(data)
+        img = data[0] if is_tuple else data
+        lbl = data[1] if is_tuple and len(data) > 1 and not get_value(self.no_label_ckbx) else None
+        meta = data[2] if is_tuple and len(data) > 2 else None
+        name = meta["file_name"] if isinstance(meta, dict) and "file_name" in meta else index
+
+        img = np.array(img) if not isinstance(img, np.ndarray) else img
+        return img, lbl, name
+
+    def show(self, img, lbl, name):
         # --- Image ---
         if self.img_layer is not None:
             self.img_layer.data = img
@@ -141,6 +215,11 @@ class DatasetInspectionWidget(QWidget):
 
         self.on_index_changed()
 
+    def closeEvent(self, event):
+        if self.store is not None:
+            self.store.flush()
+        super().closeEvent(event)
+
     def change_cm(self):
         if self.label_layer is not None:
             cm = label_colormap(
@@ -149,9 +228,206 @@ class DatasetInspectionWidget(QWidget):
             self.label_layer.colormap = cm
 
 
-def run_dataset_inspection(dataset: "torch.utils.data.Dataset", *args, **kwargs):
+def _to_numpy(data):
+    """Convert a collated batch (tensors in tuples, lists and dicts) to numpy arrays."""
+    if isinstance(data, tuple):
+        return tuple(_to_numpy(d) for d in data)
+    if isinstance(data, list):
+        return [_to_numpy(d) for d in data]
+    if isinstance(data, dict):
+        return {k: _to_numpy(v) for k, v in data.items()}
+    if hasattr(data, "detach"):
+        return data.detach().cpu().numpy()
+    return data
+
+
+class BatchPrefetcher:
+    """Iterates a DataLoader in a background thread, keeping up to `prefetch` batches ready."""
+
+    _END = object()
+
+    def __init__(self, loader, prefetch: int = 1):
+        self.loader = loader
+        self.prefetch = prefetch
+        self._queue = None
+        self._stop = None
+        self.restart()
+
+    def restart(self):
+        """Start a new pass over the loader (a new epoch for shuffling loaders)."""
+        self.close()
+        self._queue = queue.Queue(maxsize=self.prefetch)
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(self._queue, self._stop), daemon=True).start()
+
+    def _run(self, q, stop):
+        end = self._END
+        try:
+            for batch in self.loader:
+                # the conversion happens here as well, off the GUI thread
+                if not self._put(q, _to_numpy(batch), stop):
+                    return
+        except Exception as e:  # noqa: BLE001
+            # ends the pass as well, get reports it on the GUI thread
+            end = e
+        self._put(q, end, stop)
+
+    @staticmethod
+    def _put(q, item, stop) -> bool:
+        """Put item into the queue, gives up once stopped instead of blocking on a full queue."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self):
+        """Next batch, None once the loader is exhausted or failed."""
+        batch = self._queue.get()
+        if isinstance(batch, Exception):
+            show_error(f"Loading batch failed: {batch}")
+            batch = self._END
+        if batch is self._END:
+            # keep returning None on further calls
+            self._queue.put(self._END)
+            return None
+        return batch
+
+    def close(self):
+        if self._stop is not None:
+            self._stop.set()
+
+
+class DatasetBatchInspectionWidget(DatasetInspectionWidget):
+    """Shows whole collated batches of a DataLoader, the batch is the first axis of each layer.
+
+    Batches are streamed from the loader while the next one is prefetched in the background.
+    The last `history` batches can be revisited; jumping further back starts a new pass over
+    the loader, which yields new batches for shuffling loaders or random augmentations.
+    Loaders over an IterableDataset have no length, the progressbar then grows with the
+    batches seen until the loader is exhausted.
+    """
+
+    def __init__(
+        self,
+        viewer: "napari.viewer.Viewer",
+        dataloader: "torch.utils.data.DataLoader",
+        channel_first: bool = True,
+        rescale: bool = False,
+        no_label: bool = False,
+        bg_class: int = 0,
+        prefetch: int = 1,
+        history: int = 4,
+    ):
+        self.history = history
+        self.batches = OrderedDict()
+        self.next_batch = 0
+        # None until the end of a loader without a length was reached
+        self.num_batches = _loader_length(dataloader)
+        self.prefetcher = BatchPrefetcher(dataloader, prefetch)
+        super().__init__(viewer, dataloader, channel_first, rescale, no_label, bg_class)
+
+    def build_gui_navigation(self, layout):
+        super().build_gui_navigation(layout)
+        # the progressbar counts batches
+        self.update_maximum()
+
+    def num_items(self):
+        return self.num_batches
+
+    def update_maximum(self):
+        if self.num_batches is not None:
+            self.progressbar.setMaximum(max(self.num_batches - 1, 0))
+        else:
+            # one step past the batches seen so far
+            self.progressbar.setMaximum(self.next_batch)
+
+    def build_gui_samples(self, layout):
+        # batches come straight from the loader, seeds and the store do not apply
+        pass
+
+    def fetch_batch(self, index):
+        if index in self.batches:
+            self.batches.move_to_end(index)
+            return self.batches[index]
+        if index < self.next_batch:
+            # too far back, start a new pass
+            self.prefetcher.restart()
+            self.batches.clear()
+            self.next_batch = 0
+        while self.next_batch <= index:
+            batch = self.prefetcher.get()
+            if batch is None:
+                self.num_batches = self.next_batch
+                break
+            self.batches[self.next_batch] = batch
+            self.next_batch += 1
+            while len(self.batches) > self.history:
+                self.batches.popitem(last=False)
+        return self.batches.get(index)
+
+    def on_index_changed(self):
+        index = get_value(self.progressbar)
+        batch = self.fetch_batch(index)
+        self.update_maximum()
+        if batch is None:
+            return
+        img, lbl, _ = self.unpack(batch, index)
+
+        if get_value(self.channel_first_ckbx):
+            img = np.moveaxis(img, 1, -1)
+
+        if get_value(self.rescale_ckbx):
+            # every sample of the batch separately
+            axes = tuple(range(1, img.ndim))
+            img = img - np.min(img, axis=axes, keepdims=True)
+            img = img / np.maximum(np.max(img, axis=axes, keepdims=True), 1e-8)
+
+        self.show(img, lbl, f"batch_{index}")
+
+    def closeEvent(self, event):
+        self.prefetcher.close()
+        super().closeEvent(event)
+
+
+def _loader_length(loader):
+    try:
+        return len(loader)
+    except TypeError:
+        # DataLoader over an IterableDataset without __len__
+        return None
+
+
+def _is_dataloader(obj) -> bool:
+    # a DataLoader can only exist if torch was imported already, never import it here
+    torch_data = sys.modules.get("torch.utils.data")
+    return torch_data is not None and isinstance(obj, torch_data.DataLoader)
+
+
+def run_dataset_inspection(
+    dataset: "torch.utils.data.Dataset",
+    *args,
+    batch_size: int | None = None,
+    num_workers: int = 0,
+    **kwargs,
+):
+    """Inspect a dataset item by item, or batch by batch for a DataLoader or a batch_size.
+
+    A DataLoader is used as is, with a batch_size one is built over the dataset using
+    num_workers loader processes.
+    """
+    if batch_size is not None and not _is_dataloader(dataset):
+        from torch.utils.data import DataLoader
+
+        dataset = DataLoader(dataset, batch_size=batch_size, num_workers=num_workers)
+
     viewer = napari.Viewer()
-    widget = DatasetInspectionWidget(viewer, dataset, *args, **kwargs)
+    if _is_dataloader(dataset):
+        widget = DatasetBatchInspectionWidget(viewer, dataset, *args, **kwargs)
+    else:
+        widget = DatasetInspectionWidget(viewer, dataset, *args, **kwargs)
 
     viewer.window.add_dock_widget(
         widget,
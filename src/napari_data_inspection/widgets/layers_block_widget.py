@@ -1,3 +1,6 @@
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from contextlib import suppress
 from pathlib import Path
 from typing import Union
 
@@ -21,22 +24,64 @@ from napari_toolkit.widgets.buttons.tool_button import (  # make get_value,set_v
 from qtpy.QtCore import Signal
 from qtpy.QtWidgets import QLayout, QSizePolicy, QVBoxLayout, QWidget
 from vidata import LOADER_REGISTRY
-from vidata.file_manager import FileManager
+
+from napari_data_inspection.data_inspection._backend_benchmark import benchmark_backends
+from napari_data_inspection.data_inspection._file_table import FileTable, list_files
+from napari_data_inspection.data_inspection._frames import open_frames
 
 PathLike = Union[str, Path]
 
 REGISTRY_MAPPING = {"Image": "image", "Labels": "mask"}
+# picks the fastest equivalent backend by benchmarking them on the layer's files
+AUTO_BACKEND = "auto"
+
+# directory scans are I/O bound (network storage), so run several of them concurrently
+SCAN_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="layer-scan")
+
+
+def scan_files(path, file_type, pattern=None, include_names=None, cancelled=None):
+    """Collect the files like a vidata FileManager and pack them into a FileTable.
+
+    cancelled (threading.Event) is checked before and after listing the directory, the listing
+    itself can not be interrupted.
+    """
+    if cancelled is not None and cancelled.is_set():
+        raise CancelledError
+    root, names = list_files(path, file_type, pattern, include_names)
+    if cancelled is not None and cancelled.is_set():
+        raise CancelledError
+    return FileTable(root, names, file_type)
+
+
+def _emit_when_done(future, signal):
+    """Hand a finished future to the GUI thread through a (queued) signal."""
+
+    def _on_done(fut):
+        # RuntimeError: the block was deleted while the job was running
+        with suppress(RuntimeError):
+            signal.emit(fut)
+
+    future.add_done_callback(_on_done)
 
 
 class LayerBlock(QWidget):
     deleted = Signal(QWidget)
     updated = Signal(QWidget)
     loaded = Signal(QWidget)
+    _scan_finished = Signal(object)
+    _benchmark_finished = Signal(object)
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.fm = FileManager("", "")
+        self.fm = FileTable()
         self.include_names = None
+        self._scan_future = None
+        self._scan_cancelled = None
+        self._scan_finished.connect(self._on_scan_finished)
+        self.auto_backend = None
+        self.auto_timings = {}
+        self._benchmark_future = None
+        self._benchmark_finished.connect(self._on_benchmark_finished)
 
         main_layout = QVBoxLayout()
         container, layout = setup_vgroupbox(main_layout)
@@ -58,7 +103,7 @@ class LayerBlock(QWidget):
             None, "", "delete", theme=get_theme_colors().id, function=self.remove_self
         )
         self.refresh_btn = setup_iconbutton(
-            None, "", "right_arrow", theme=get_theme_colors().id, function=self.refresh
+            None, "", "right_arrow", theme=get_theme_colors().id, function=self.on_refresh
         )
         # // Next Line
         # Pattern
@@ -83,9 +128,8 @@ class LayerBlock(QWidget):
         self.name_ledt.setMinimumWidth(50)
         self.pattern_ledt.setMinimumWidth(50)
 
-        backend_options = list(LOADER_REGISTRY[REGISTRY_MAPPING[self.ltype]][self.file_type].keys())
         self.backend_btn = setup_toolbutton(
-            None, backend_options, tooltips="Backend/Package to load the data"
+            None, self.backend_options(), tooltips="Backend/Package to load the data"
         )
         self.backend_btn.setFixedWidth(30)
 
@@ -116,7 +160,16 @@ class LayerBlock(QWidget):
 
     @property
     def backend(self):
-        return get_option(self.backend_btn)
+        option = get_option(self.backend_btn)
+        if option == AUTO_BACKEND:
+            # until the benchmark is done use the default backend, like without auto
+            return self.auto_backend or self.backend_options()[0]
+        return option
+
+    def backend_options(self):
+        options = list(LOADER_REGISTRY[REGISTRY_MAPPING[self.ltype]][self.file_type].keys())
+        # the registry default stays first, auto is opt-in
+        return [*options, AUTO_BACKEND] if len(options) > 1 else options
 
     @property
     def pattern(self):
@@ -124,17 +177,21 @@ class LayerBlock(QWidget):
 
     @property
     def files(self):
-        return self.fm.files
+        return self.fm
 
     def get_config(self):
-        return {
+        config = {
             "name": get_value(self.name_ledt),
             "type": get_value(self.ltype_cbx)[0],
             "path": get_value(self.path_ledt),
             "file_type": get_value(self.file_type_cbx)[0],
             "pattern": get_value(self.pattern_ledt),
-            "backend": get_option(self.backend_btn),
+            # always a backend vidata knows, the auto choice is kept separately
+            "backend": self.backend,
         }
+        if get_option(self.backend_btn) == AUTO_BACKEND:
+            config["auto_backend"] = {"backend": self.auto_backend, "timings": self.auto_timings}
+        return config
 
     def set_config(self, config):
         set_value(self.name_ledt, config["name"])
@@ -148,16 +205,28 @@ class LayerBlock(QWidget):
         )
         self.include_names = config.get("include_names")
 
+        # restore auto and a previous benchmark, changing the file type above resets it
+        if "auto_backend" in config and AUTO_BACKEND in self.backend_options():
+            activate_option(self.backend_btn, AUTO_BACKEND)
+        auto_config = config.get("auto_backend") or {}
+        if auto_config.get("backend") in self.backend_options():
+            self.auto_backend = auto_config["backend"]
+            self.auto_timings = dict(auto_config.get("timings") or {})
+            self._update_backend_tooltip()
+
     def on_change_ltype(self):
         self.on_change_file_type()
 
     def on_change_file_type(self):
-        backend_options = list(LOADER_REGISTRY[REGISTRY_MAPPING[self.ltype]][self.file_type].keys())
-        set_options(self.backend_btn, backend_options)
+        set_options(self.backend_btn, self.backend_options())
+        self.auto_backend = None
+        self.auto_timings = {}
+        self._update_backend_tooltip()
         self.on_change()
 
     def on_change(self):
-        self.fm = FileManager("", "")
+        self.cancel_refresh()
+        self.fm = FileTable()
 
         _icon = QColoredSVGIcon.from_resources("right_arrow")
 
@@ -165,14 +234,71 @@ class LayerBlock(QWidget):
         self.refresh_btn.setIcon(_icon)
         self.updated.emit(self)
 
+    def on_refresh(self):
+        self.refresh_async()
+
     def refresh(self):
         # self.files = collect_files(self.path, self.file_type, get_value(self.pattern_ledt))
-        self.fm = FileManager(
+        self.cancel_refresh()
+        self.set_file_manager(
+            scan_files(
+                path=self.path,
+                file_type=self.file_type,
+                pattern=self.pattern,
+                include_names=self.include_names,
+            )
+        )
+
+    def refresh_async(self, executor=None):
+        """Scan the directory in the background, `loaded` is emitted on the GUI thread."""
+        self.cancel_refresh()
+        executor = SCAN_EXECUTOR if executor is None else executor
+        self._scan_cancelled = threading.Event()
+        # read the widget values here, the worker must not touch Qt objects
+        future = executor.submit(
+            scan_files,
+            cancelled=self._scan_cancelled,
             path=self.path,
             file_type=self.file_type,
             pattern=self.pattern,
             include_names=self.include_names,
         )
+        self._scan_future = future
+        _emit_when_done(future, self._scan_finished)
+        return future
+
+    @property
+    def scanning(self):
+        return self._scan_future is not None
+
+    def cancel_refresh(self):
+        """Cancel a queued scan, a running one stops before its files are packed.
+
+        The directory listing of a running scan finishes in the background, its result is
+        dropped and `loaded` is not emitted.
+        """
+        if self._scan_future is not None:
+            self._scan_cancelled.set()
+            self._scan_future.cancel()
+            self._scan_future = None
+
+    def _on_scan_finished(self, future):
+        # ignore cancelled and superseded scans
+        if future is not self._scan_future or future.cancelled():
+            return
+        self._scan_future = None
+        try:
+            fm = future.result()
+        except Exception as e:  # noqa: BLE001
+            print(f"Scanning {self.path} failed: {e}")
+            return
+        self.set_file_manager(fm)
+
+    def set_file_manager(self, fm):
+        self.fm = fm if isinstance(fm, FileTable) else FileTable.from_file_manager(fm)
+
+        if get_option(self.backend_btn) == AUTO_BACKEND and self.auto_backend is None:
+            self.run_benchmark()
 
         if len(self.fm) != 0 and get_value(self.name_ledt) != "":
             _icon = QColoredSVGIcon.from_resources("check")
@@ -181,7 +307,43 @@ class LayerBlock(QWidget):
 
             self.loaded.emit(self)
 
+    def run_benchmark(self, executor=None):
+        """Benchmark all backends of the file type on a sample of files in the background."""
+        if self._benchmark_future is not None:
+            self._benchmark_future.cancel()
+        executor = SCAN_EXECUTOR if executor is None else executor
+        loaders = dict(LOADER_REGISTRY[REGISTRY_MAPPING[self.ltype]][self.file_type])
+        future = executor.submit(benchmark_backends, loaders, self.files)
+        self._benchmark_future = future
+        _emit_when_done(future, self._benchmark_finished)
+
+    def _on_benchmark_finished(self, future):
+        if future is not self._benchmark_future or future.cancelled():
+            return
+        self._benchmark_future = None
+        try:
+            best, timings = future.result()
+        except Exception as e:  # noqa: BLE001
+            print(f"Backend benchmark for {self.name} failed: {e}")
+            return
+        if best is None:
+            return
+        self.auto_backend = best
+        self.auto_timings = timings
+        self._update_backend_tooltip()
+
+    def _update_backend_tooltip(self):
+        tooltip = "Backend/Package to load the data"
+        if self.auto_backend is not None:
+            timings = ", ".join(
+                f"{k}: {v * 1000:.0f} ms" if v is not None else f"{k}: n/a"
+                for k, v in self.auto_timings.items()
+            )
+            tooltip += f"\nauto -> {self.auto_backend} ({timings})"
+        self.backend_btn.setToolTip(tooltip)
+
     def remove_self(self):
+        self.cancel_refresh()
         self.deleted.emit(self)
         parent_layout = self.parentWidget().layout()
         if parent_layout:
@@ -189,9 +351,23 @@ class LayerBlock(QWidget):
         self.setParent(None)
         self.deleteLater()
 
+    def loader(self):
+        return LOADER_REGISTRY[REGISTRY_MAPPING[self.ltype]][self.file_type][self.backend]
+
+    def load_key(self, path):
+        """Identifies a decode, blocks loading the same file with the same loader share it.
+
+        Image and Labels share the loader functions, but labels are decoded differently (not
+        from the shared cache, with box and statistics), so the layer type is part of the key.
+        """
+        return str(path), self.loader(), self.ltype == "Labels"
+
     def load_data(self, path):
-        lf = LOADER_REGISTRY[REGISTRY_MAPPING[self.ltype]][self.file_type][self.backend]
-        return lf(path)
+        return self.loader()(path)
+
+    def load_frames(self, path, cache_frames=16, window=2):
+        """Open a 4D file frame by frame, (LazyFrameArray, meta) or None if not supported."""
+        return open_frames(path, self.backend, self.loader(), cache_frames, window)
 
     def __getitem__(self, item):
         if item < len(self.fm):
@@ -0,0 +1,24 @@
+import pytest
+
+from napari_data_inspection.data_inspection._case_filter import (
+    case_namespace,
+    compile_filter,
+    evaluate_filter,
+    required_fields,
+)
+
+
+def test_fields_inside_generators_are_required():
+    code = compile_filter("any(3 in classes for _ in [0])")
+    assert "classes" in required_fields(code)
+
+    namespace = case_namespace(0, "case", {"lbl": {"classes": [1, 3]}})
+    assert evaluate_filter(code, namespace)
+    assert evaluate_filter(compile_filter("[c for c in classes if c > 2] == [3]"), namespace)
+
+
+def test_dunder_inside_generators_is_rejected():
+    with pytest.raises(ValueError):
+        compile_filter("any(x.__class__ for x in [0])")
+    with pytest.raises(ValueError):
+        compile_filter("[y for y in [().__class__.__base__]]")
@@ -0,0 +1,98 @@
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("napari")
+
+from napari.components import ViewerModel  # noqa: E402
+
+from napari_data_inspection.dataset_inspection.dataset_widget import (  # noqa: E402
+    BatchPrefetcher,
+    DatasetBatchInspectionWidget,
+    _is_dataloader,
+)
+
+
+class Viewer(ViewerModel):
+    """Viewer model with the close the widget binds to [q], no OpenGL context needed."""
+
+    def close(self):
+        pass
+
+
+class IterableLoader:
+    """Stands in for a DataLoader over an IterableDataset: batches as lists, no __len__."""
+
+    def __init__(self, num_batches):
+        self.num_batches = num_batches
+
+    def __iter__(self):
+        for i in range(self.num_batches):
+            # default_collate returns [images, labels] for (image, label) samples
+            yield [np.full((2, 1, 4, 4), i, np.float32), np.full((2, 4, 4), i, np.int64)]
+
+
+def test_list_batches_without_length(qtbot):
+    viewer = Viewer()
+    widget = DatasetBatchInspectionWidget(viewer, IterableLoader(3))
+    qtbot.addWidget(widget)
+
+    assert widget.img_layer.data.shape == (2, 4, 4, 1)
+    assert widget.label_layer.data.shape == (2, 4, 4)
+    assert widget.progressbar.max_value == 1
+
+    widget.progressbar.setValue(1)
+    widget.progressbar.setValue(2)
+    assert widget.img_layer.data[0, 0, 0, 0] == 2
+    # the end of the loader is only known after asking for a batch past it
+    widget.progressbar.setValue(3)
+    assert widget.num_batches == 3
+    assert widget.progressbar.max_value == 2
+
+
+def test_is_dataloader_does_not_import_torch():
+    torch_loaded = "torch" in sys.modules
+    assert not _is_dataloader([1, 2, 3])
+    assert ("torch" in sys.modules) == torch_loaded
+
+
+class FailingLoader:
+    def __init__(self, num_batches):
+        self.num_batches = num_batches
+
+    def __iter__(self):
+        for i in range(self.num_batches):
+            yield np.full(2, i)
+        raise RuntimeError("broken sample")
+
+
+def test_prefetcher_reports_loader_errors(monkeypatch):
+    import napari_data_inspection.dataset_inspection.dataset_widget as dataset_widget
+
+    errors = []
+    monkeypatch.setattr(dataset_widget, "show_error", errors.append)
+    prefetcher = BatchPrefetcher(FailingLoader(1))
+    assert prefetcher.get()[0] == 0
+    assert prefetcher.get() is None
+    assert prefetcher.get() is None
+    assert errors == ["Loading batch failed: broken sample"]
+
+
+def test_closed_prefetcher_does_not_block_after_error(monkeypatch):
+    import napari_data_inspection.dataset_inspection.dataset_widget as dataset_widget
+
+    threads = []
+
+    class Thread(threading.Thread):
+        def start(self):
+            threads.append(self)
+            super().start()
+
+    monkeypatch.setattr(dataset_widget.threading, "Thread", Thread)
+    # the loader fails while the queue is full and nobody consumes it anymore
+    prefetcher = BatchPrefetcher(FailingLoader(1))
+    prefetcher.close()
+    threads[0].join(timeout=2)
+    assert not threads[0].is_alive()
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from napari_data_inspection.data_inspection._file_table import FileTable, list_files
+
+
+def test_common_root_is_filesystem_root():
+    paths = ["/data/a.nii.gz", "/mnt/b.nii.gz"]
+    table = FileTable.from_paths(paths, file_type=".nii.gz")
+    assert table.root == "/"
+    assert table.names() == ["data/a.nii.gz", "mnt/b.nii.gz"]
+    assert [str(p) for p in table] == paths
+    assert table.name_from_path(paths[1], False) == "mnt/b"
+
+
+def test_sibling_prefix_is_not_stripped():
+    table = FileTable.from_paths(["/data/a.npy", "/database/b.npy"], root="/data")
+    assert table.names() == ["a.npy", "/database/b.npy"]
+    assert [str(p) for p in table] == ["/data/a.npy", "/database/b.npy"]
+    assert table.name_from_path("/database/b.npy") == "/database/b.npy"
+
+
+def test_indexing_and_search():
+    paths = [Path(f"/data/imgs/case_{i:04d}.npy") for i in range(100)]
+    table = FileTable.from_paths(paths, root="/data/imgs", file_type=".npy")
+    assert len(table) == 100
+    assert table[7] == paths[7]
+    assert table[-1] == paths[-1]
+    assert table.name(3, include_ext=False) == "case_0003"
+    assert table.search("0042") == [42]
+    assert table.search("case_00", 3) == [0, 1, 2]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name in [
+        "case_10_img",
+        "case_2_img",
+        "case_1_seg",
+        "sub/case_3_img",
+        "sub/deep/case_4_img",
+    ]:
+        path = tmp_path / f"{name}.npy"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    (tmp_path / "dir_img.npy").mkdir()
+    (tmp_path / "notes.txt").touch()
+    return tmp_path
+
+
+@pytest.mark.parametrize("recursive", [False, True])
+@pytest.mark.parametrize("pattern", [None, "_img", "case_1*"])
+@pytest.mark.parametrize("include_names", [None, ["case_2_img", "sub/case_3_img", "missing"]])
+def test_listing_matches_file_manager(tree, pattern, recursive, include_names):
+    vidata = pytest.importorskip("vidata.file_manager")
+    fm = vidata.FileManager(tree, ".npy", pattern, include_names, recursive=recursive)
+    # the FileManager also lists directories matching the pattern
+    expected = [f for f in FileTable.from_file_manager(fm).names() if f != "dir_img.npy"]
+
+    root, names = list_files(tree, ".npy", pattern, include_names, recursive)
+    assert root == str(tree)
+    assert names == expected
+
+
+def test_listing_of_a_json_file(tree):
+    files = [str(tree / "case_2_img.npy"), str(tree / "sub/case_3_img.npy")]
+    (tree / "files.json").write_text(json.dumps(files))
+
+    root, names = list_files(tree / "files.json", ".npy")
+    assert [str(Path(root, name)) for name in names] == files
+    include = [str((tree / "sub/case_3_img").as_posix())]
+    root, names = list_files(tree / "files.json", ".npy", include_names=include)
+    assert [str(Path(root, name)) for name in names] == files[1:]
+    with pytest.raises(FileNotFoundError):
+        list_files(tree / "missing.json", ".npy")
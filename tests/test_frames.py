@@ -0,0 +1,53 @@
+import gc
+
+import numpy as np
+import pytest
+
+tifffile = pytest.importorskip("tifffile")
+pytest.importorskip("vidata")
+
+from napari_data_inspection.data_inspection._frames import open_frames  # noqa: E402
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Every TiffFile opened while streaming."""
+    files = []
+
+    class TiffFile(tifffile.TiffFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            files.append(self)
+
+    monkeypatch.setattr(tifffile, "TiffFile", TiffFile)
+    return files
+
+
+@pytest.fixture
+def series(tmp_path):
+    file = tmp_path / "series.tif"
+    tifffile.imwrite(file, np.arange(3 * 2 * 4 * 5, dtype=np.uint16).reshape(3, 2, 4, 5))
+    return file
+
+
+def test_tiff_closed_with_close(series, opened):
+    array, _ = open_frames(series, "tifffile", None)
+    assert array[1].shape == (2, 4, 5)
+    assert not opened[-1].filehandle.closed
+
+    array.close()
+    assert opened[-1].filehandle.closed
+    array.close()
+
+
+def test_tiff_closed_when_collected(series, opened):
+    array, _ = open_frames(series, "tifffile", None)
+    np.testing.assert_array_equal(array[2], tifffile.imread(series)[2])
+    array.frame(0)
+
+    # wait for the prefetches, they hold the array until they are done
+    for future in list(array._pending.values()):
+        future.result()
+    del array
+    gc.collect()
+    assert opened[-1].filehandle.closed
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("vidata")
+Image = pytest.importorskip("PIL.Image")
+
+from vidata.registry import LOADER_REGISTRY  # noqa: E402
+
+from napari_data_inspection.data_inspection._header_io import (  # noqa: E402
+    read_header,
+    validate_cases,
+)
+
+
+def loader(backend, file_type=".png"):
+    return LOADER_REGISTRY["image"][file_type][backend]
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB", "RGBA", "I;16"])
+@pytest.mark.parametrize("backend", ["pil", "pilRGB", "cv2", "cv2RGB"])
+def test_image_headers_match_loaders(tmp_path, backend, mode):
+    pytest.importorskip("cv2")
+    file = str(tmp_path / "image.png")
+    if mode == "I;16":
+        Image.fromarray(np.arange(63, dtype=np.uint16).reshape(7, 9) * 1000).save(file)
+    else:
+        Image.fromarray(np.zeros((7, 9, 3), np.uint8)).convert(mode).save(file)
+
+    data, _ = loader(backend)(file)
+    header = read_header(file, backend)
+    assert header["shape"] == data.shape
+    assert header["dtype"] == data.dtype
+
+
+def test_npz_header(tmp_path):
+    single, multiple = str(tmp_path / "single.npz"), str(tmp_path / "multiple.npz")
+    np.savez(single, data=np.zeros((3, 4, 5), np.int16))
+    np.savez(multiple, image=np.zeros(3), mask=np.zeros(4))
+
+    header = read_header(single, "numpy")
+    assert header["shape"] == (3, 4, 5)
+    assert header["dtype"] == np.int16
+    # a dict of arrays has no single shape
+    assert read_header(multiple, "numpy") is None
+
+
+def test_unknown_headers_are_skipped(tmp_path):
+    images, masks = [], []
+    for i in range(2):
+        images.append(tmp_path / f"image_{i}.npy")
+        masks.append(tmp_path / f"mask_{i}.npy")
+        np.save(images[-1], np.zeros((4, 5)))
+        np.save(masks[-1], np.zeros((4, 5 + i)))
+
+    assert read_header(images[0], "not-a-backend") is None
+    unknown = [("image", images, "numpy"), ("other", masks, "not-a-backend")]
+    assert validate_cases(unknown, 2) == {}
+    known = [("image", images, "numpy"), ("mask", masks, "numpy")]
+    assert list(validate_cases(known, 2)) == [1]
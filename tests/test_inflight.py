@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from napari_data_inspection.data_inspection._inflight import InflightRegistry
+
+
+@pytest.fixture
+def blocked_executor():
+    """Single worker executor, busy until the returned event is set."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    gate = threading.Event()
+    executor.submit(gate.wait)
+    yield executor, gate
+    gate.set()
+    executor.shutdown(wait=True)
+
+
+def test_run_takes_over_queued_job_for_all_holders(blocked_executor):
+    executor, gate = blocked_executor
+    registry = InflightRegistry(executor)
+    calls = []
+
+    def decode(value):
+        calls.append(threading.current_thread())
+        return value * 2
+
+    prefetch = registry.submit("key", decode, 21)
+    # the prefetch is queued behind the busy worker, run decodes it on this thread
+    assert registry.run("key", decode, 21) == 42
+    assert prefetch.result(timeout=1) == 42
+    assert calls == [threading.current_thread()]
+
+    gate.set()
+    executor.shutdown(wait=True)
+    assert len(calls) == 1
+
+
+def test_run_shares_exception_with_holders(blocked_executor):
+    executor, _ = blocked_executor
+    registry = InflightRegistry(executor)
+
+    def decode():
+        raise ValueError("broken file")
+
+    prefetch = registry.submit("key", decode)
+    with pytest.raises(ValueError):
+        registry.run("key", decode)
+    assert isinstance(prefetch.exception(timeout=1), ValueError)
+
+
+def test_release_cancels_unused_queued_job(blocked_executor):
+    executor, gate = blocked_executor
+    registry = InflightRegistry(executor)
+    calls = []
+
+    first = registry.submit("key", calls.append, 1)
+    second = registry.submit("key", calls.append, 1)
+    assert first is second
+    registry.release("key", first)
+    assert not first.cancelled()
+    registry.release("key", second)
+    assert first.cancelled()
+    assert "key" not in registry
+
+    gate.set()
+    executor.shutdown(wait=True)
+    assert calls == []
+
+
+def test_shutdown_cancels_shared_future(blocked_executor):
+    executor, _ = blocked_executor
+    registry = InflightRegistry(executor)
+
+    future = registry.submit("key", lambda: 1)
+    executor.shutdown(wait=False, cancel_futures=True)
+    assert future.cancelled()
+    assert "key" not in registry
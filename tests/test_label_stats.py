@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+ndimage = pytest.importorskip("scipy.ndimage")
+
+from napari_data_inspection.data_inspection import _label_stats  # noqa: E402
+from napari_data_inspection.data_inspection._label_stats import label_statistics  # noqa: E402
+
+
+def naive_components(data, cls):
+    structure = ndimage.generate_binary_structure(data.ndim, data.ndim)
+    return ndimage.label(data == cls, structure=structure)[1]
+
+
+def test_statistics_match_full_volume_labelling():
+    rng = np.random.default_rng(0)
+    data = np.zeros((20, 30, 40), np.uint8)
+    data[rng.random(data.shape) > 0.97] = 1
+    data[2:5, 2:5, 2:5] = 2
+    data[10:12, 20:25, 30:31] = 2
+    data[15, 0, 0] = 7
+    affine = np.diag([2.0, 1.0, 0.5, 1.0])
+
+    stats = label_statistics(data, affine)
+    assert sorted(stats) == [1, 2, 7]
+    for cls, s in stats.items():
+        assert s["voxels"] == int((data == cls).sum())
+        assert s["volume"] == pytest.approx(s["voxels"])
+        assert s["components"] == naive_components(data, cls)
+
+
+def test_classes_are_labelled_inside_their_boxes(monkeypatch):
+    data = np.zeros((50, 50, 50), np.int32)
+    data[1:3, 1:3, 1:3] = 1
+    data[40:45, 40:42, 0:50] = 5
+    shapes = []
+    label = ndimage.label
+
+    def recording_label(mask, **kwargs):
+        shapes.append(mask.shape)
+        return label(mask, **kwargs)
+
+    monkeypatch.setattr(_label_stats.ndimage, "label", recording_label)
+    stats = label_statistics(data)
+    assert {cls: s["components"] for cls, s in stats.items()} == {1: 1, 5: 1}
+    assert sorted(shapes) == [(2, 2, 2), (5, 2, 50)]
+
+
+def test_float_and_negative_labels_fall_back_to_the_volume():
+    data = np.zeros((4, 4), np.int16)
+    data[0, 0] = -1
+    data[3, 3] = data[0, 3] = 2
+    stats = label_statistics(data)
+    assert stats[-1]["components"] == 1
+    assert stats[2]["components"] == 2
+    assert label_statistics(data.astype(float))[2.0]["components"] == 2
@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("napari")
+
+from napari_data_inspection.widgets import layers_block_widget  # noqa: E402
+from napari_data_inspection.widgets.layers_block_widget import LayerBlock  # noqa: E402
+
+
+@pytest.fixture
+def block(qtbot, tmp_path):
+    for i in range(3):
+        np.save(tmp_path / f"case_{i}.npy", np.zeros((2, 2)))
+    block = LayerBlock()
+    qtbot.addWidget(block)
+    block.set_config({"name": "img", "path": str(tmp_path), "file_type": ".npy", "type": "Image"})
+    return block
+
+
+def test_refresh_async_loads_files(block, qtbot):
+    with qtbot.waitSignal(block.loaded, timeout=5000):
+        block.refresh_async()
+    assert len(block) == 3
+    assert not block.scanning
+
+
+def test_cancel_stops_a_running_scan(block, qtbot, monkeypatch):
+    listing, release = threading.Event(), threading.Event()
+    list_files = layers_block_widget.list_files
+
+    def slow_list_files(*args):
+        listing.set()
+        release.wait(5)
+        return list_files(*args)
+
+    packed = []
+    monkeypatch.setattr(layers_block_widget, "list_files", slow_list_files)
+    monkeypatch.setattr(layers_block_widget, "FileTable", lambda *args: packed.append(args))
+    loaded = []
+    block.loaded.connect(loaded.append)
+
+    future = block.refresh_async()
+    assert listing.wait(5)
+    block.cancel_refresh()
+    assert not block.scanning
+    release.set()
+
+    with pytest.raises(layers_block_widget.CancelledError):
+        future.result(timeout=5)
+    qtbot.wait(50)
+    # the listing finished, but its files are neither packed nor loaded
+    assert packed == []
+    assert loaded == []
+    assert len(block) == 0
@@ -0,0 +1,122 @@
+import argparse
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("napari")
+
+from napari_data_inspection import _cli  # noqa: E402
+from napari_data_inspection.data_inspection._profiling import (  # noqa: E402
+    TRACE_VERSION,
+    compare_summaries,
+    load_trace,
+    replay_trace,
+    summarize,
+)
+
+
+def event(index, start, duration, *caches):
+    layers = {
+        f"layer_{i}": {"cache": cache, "load": 0.5, "render": 0.25}
+        for i, cache in enumerate(caches)
+    }
+    return {"index": index, "start": start, "end": start + duration, "layers": layers}
+
+
+def trace_file(path, cases, events):
+    project = {
+        "name": "project",
+        "layers": [
+            {
+                "name": "img",
+                "path": str(cases),
+                "file_type": ".npy",
+                "type": "Image",
+                "backend": "numpy",
+            }
+        ],
+    }
+    trace = {"version": TRACE_VERSION, "project": project, "events": events}
+    path.write_text(json.dumps(trace))
+    return path
+
+
+@pytest.fixture
+def cases(tmp_path):
+    for i in range(4):
+        np.save(tmp_path / f"case_{i}.npy", np.full((4, 5), i, np.float32))
+    return tmp_path
+
+
+def test_summarize():
+    assert summarize([]) == {}
+    events = [event(0, 0.0, 1.0, "miss", "hit"), event(1, 2.0, 3.0, "hit", "inflight")]
+    summary = summarize(events)
+    assert summary["navigations"] == 2
+    assert summary["mean"] == pytest.approx(2.0)
+    assert summary["p50"] == pytest.approx(2.0)
+    assert summary["max"] == pytest.approx(3.0)
+    assert summary["hit_rate"] == pytest.approx(0.5)
+    assert summary["load"] == pytest.approx(2.0)
+    assert summary["render"] == pytest.approx(1.0)
+
+
+def test_load_trace_rejects_other_versions(tmp_path):
+    path = tmp_path / "trace.json"
+    path.write_text(json.dumps({"version": TRACE_VERSION, "events": []}))
+    assert load_trace(path)["events"] == []
+    path.write_text(json.dumps({"version": TRACE_VERSION + 1, "events": []}))
+    with pytest.raises(ValueError, match="Unsupported trace version"):
+        load_trace(path)
+
+
+def test_compare_summaries():
+    recorded = summarize([event(0, 0.0, 1.0, "miss")])
+    table = compare_summaries(recorded, {}).splitlines()
+    assert table[0].split() == ["recorded", "replayed"]
+    assert table[1].split() == ["navigations", "1", "-"]
+    assert table[6].split() == ["hit_rate", "0.0000", "-"]
+
+
+def test_replay_trace(qtbot, qapp, tmp_path, cases):
+    from napari.components import ViewerModel
+
+    from napari_data_inspection import DataInspectionWidget
+
+    widget = DataInspectionWidget(ViewerModel())
+    qtbot.addWidget(widget)
+    trace = load_trace(trace_file(tmp_path / "trace.json", cases, []))
+    widget.load_config(trace["project"])
+    trace["events"] = [event(i, 0.01 * i, 0.0, "miss") for i in (2, 0, 3)]
+
+    events = replay_trace(
+        widget, trace, process_events=qapp.processEvents, output=tmp_path / "replay.json"
+    )
+    assert [e["index"] for e in events] == [2, 0, 3]
+    assert all(list(e["layers"]) == ["img"] for e in events)
+    assert widget.viewer.layers[0].data[0, 0] == 3
+    assert [e["index"] for e in load_trace(tmp_path / "replay.json")["events"]] == [2, 0, 3]
+
+
+def test_cli_replay_needs_no_gl_viewer(monkeypatch, capsys, qapp, tmp_path, cases):
+    def viewer(*args, **kwargs):
+        raise AssertionError("the replay must not create a napari.Viewer")
+
+    monkeypatch.setattr(_cli.napari, "Viewer", viewer)
+    path = trace_file(tmp_path / "trace.json", cases, [event(1, 0.0, 0.1, "miss")])
+    args = argparse.Namespace(
+        replay=path,
+        config=None,
+        split=None,
+        fold=None,
+        profile=tmp_path / "replayed.json",
+        no_realtime=True,
+        profile_cpu=False,
+        profile_memory=False,
+    )
+    _cli.replay(args)
+
+    output = capsys.readouterr().out.splitlines()
+    assert ["navigations", "1", "1"] in [line.split() for line in output]
+    assert [e["index"] for e in load_trace(tmp_path / "replayed.json")["events"]] == [1]
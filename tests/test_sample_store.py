@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+
+from napari_data_inspection.dataset_inspection._sample_store import (
+    SampleStore,
+    dataset_fingerprint,
+)
+
+
+class Transform:
+    """No __repr__, the default repr contains the memory address."""
+
+
+class Dataset:
+    def __init__(self, length, scale):
+        self.length = length
+        self.scale = scale
+        self.transform = Transform()
+
+    def __len__(self):
+        return self.length
+
+
+def sample(i):
+    return np.full((2, 3), i, np.float32), np.full((3,), i, np.int64), {"file_name": f"case_{i}"}
+
+
+def test_roundtrip_across_sessions(tmp_path):
+    store = SampleStore(tmp_path, fingerprint="a")
+    store.put(0, 7, sample(0))
+    store.put(1, 7, np.arange(4))
+    store.flush()
+
+    store = SampleStore(tmp_path, fingerprint="a")
+    image, label, meta = store.get(0, 7)
+    assert image[0, 0] == 0 and label.dtype == np.int64 and meta == {"file_name": "case_0"}
+    assert isinstance(image, np.memmap)
+    assert list(store.get(1, 7)) == [0, 1, 2, 3]
+    assert store.get(0, 8) is None
+
+
+def test_samples_of_another_fingerprint_are_discarded(tmp_path):
+    store = SampleStore(tmp_path, fingerprint="a")
+    store.put(0, 7, sample(0))
+    store.flush()
+
+    store = SampleStore(tmp_path, fingerprint="b")
+    assert store.get(0, 7) is None
+    assert len(store) == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index.json"]
+    assert json.loads((tmp_path / "index.json").read_text())["fingerprint"] == "b"
+
+
+def test_stores_without_fingerprint_are_discarded(tmp_path):
+    np.save(tmp_path / "0_7_0.npy", np.zeros(3))
+    entry = {"parts": [["npy", "0_7_0.npy"]], "tuple": False, "nbytes": 152, "access": 0.0}
+    (tmp_path / "index.json").write_text(json.dumps({"0_7": entry}))
+
+    store = SampleStore(tmp_path, fingerprint="a")
+    assert store.get(0, 7) is None
+    assert not (tmp_path / "0_7_0.npy").exists()
+
+
+def test_put_appends_to_the_log(tmp_path):
+    store = SampleStore(tmp_path, fingerprint="a")
+    index = (tmp_path / "index.json").read_text()
+    for i in range(3):
+        store.put(i, 0, sample(i))
+    # the index is not rewritten per sample
+    assert (tmp_path / "index.json").read_text() == index
+    assert len((tmp_path / "index.log").read_text().splitlines()) == 3
+
+    # without a flush, e.g. after a crash, the samples are recovered from the log
+    with open(tmp_path / "index.log", "a") as f:
+        f.write('["3_0", {"parts"')
+    store = SampleStore(tmp_path, fingerprint="a")
+    assert len(store) == 3
+    assert store.get(2, 0)[2] == {"file_name": "case_2"}
+    assert not (tmp_path / "index.log").exists()
+
+
+def test_eviction_is_logged(tmp_path):
+    store = SampleStore(tmp_path, fingerprint="a")
+    store.put(0, 0, np.zeros(100))
+    store.max_bytes = store.nbytes
+    store.put(1, 0, np.zeros(100))
+
+    store = SampleStore(tmp_path, fingerprint="a")
+    assert store.get(0, 0) is None
+    assert store.get(1, 0) is not None
+
+
+def test_dataset_fingerprint():
+    # stable across instances, even with reprs containing memory addresses
+    assert dataset_fingerprint(Dataset(10, 1.0)) == dataset_fingerprint(Dataset(10, 1.0))
+    assert dataset_fingerprint(Dataset(10, 1.0)) != dataset_fingerprint(Dataset(11, 1.0))
+    assert dataset_fingerprint(Dataset(10, 1.0)) != dataset_fingerprint(Dataset(10, 2.0))
@@ -0,0 +1,76 @@
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+from multiprocessing import AuthenticationError
+
+import numpy as np
+import pytest
+
+from napari_data_inspection.data_inspection import _shared_cache
+from napari_data_inspection.data_inspection._shared_cache import SharedArrayCache
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="unix socket coordinator")
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    # short path, unix socket paths are limited to ~100 characters
+    path = tempfile.mkdtemp(prefix="ndi-")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", path)
+    return path
+
+
+def test_runtime_files_are_private(runtime):
+    key = _shared_cache.load_authkey()
+    assert len(key) == 32
+    assert _shared_cache.load_authkey() == key
+    directory = _shared_cache.runtime_dir()
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+    assert stat.S_IMODE((directory / "authkey").stat().st_mode) == 0o600
+
+
+def test_roundtrip_and_wrong_key(runtime):
+    cache = SharedArrayCache(max_bytes=1024**2).connect()
+    try:
+        data = np.arange(12, dtype=np.int16).reshape(3, 4)
+        shared, meta = cache.put("key", data, {"affine": None})
+        assert not shared.flags.writeable
+        cached, meta = cache.get("key")
+        np.testing.assert_array_equal(cached, data)
+
+        with pytest.raises(AuthenticationError):
+            SharedArrayCache(authkey=b"wrong").connect(start=False)
+    finally:
+        cache.close()
+
+
+def test_coordinator_does_not_import_napari():
+    code = (
+        "import sys, napari_data_inspection.data_inspection._shared_cache;"
+        "print(any(m in sys.modules for m in ('napari', 'qtpy', 'vispy')))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_pid_alive_posix():
+    assert _shared_cache._pid_alive(os.getpid())
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    assert not _shared_cache._pid_alive(process.pid)
+
+
+def test_pid_alive_never_signals_on_windows(monkeypatch):
+    def kill(pid, sig):
+        raise AssertionError("os.kill terminates the process on Windows")
+
+    checked = []
+    monkeypatch.setattr(_shared_cache.os, "name", "nt")
+    monkeypatch.setattr(_shared_cache.os, "kill", kill)
+    monkeypatch.setattr(
+        _shared_cache, "_windows_pid_alive", lambda pid: checked.append(pid) or True
+    )
+    assert _shared_cache._pid_alive(1234)
+    assert checked == [1234]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("vidata")
+
+from napari_data_inspection.data_inspection import _snapshot  # noqa: E402
+
+
+def test_middle_frame_keeps_spatial_affine(tmp_path, monkeypatch):
+    # 4D series with a spatial-only (4x4) affine, axis 0 of the volume has spacing 2
+    data = np.zeros((3, 4, 5, 6), np.float32)
+    affine = np.diag([2.0, 1.0, 1.0, 1.0])
+    monkeypatch.setattr(_snapshot, "load_layer", lambda *args: (data, {"affine": affine}))
+
+    _, thumb = _snapshot.render_case(
+        0, "case", [("img", "case.npy", "image", ".npy", "numpy")], tmp_path, thumb_size=1000
+    )
+    # the sagittal/coronal tiles are stretched to 2 * 4 rows
+    assert thumb.shape[0] == 8
+
+
+def test_cli_cases_skip_layers_without_files(tmp_path):
+    from omegaconf import OmegaConf
+
+    from napari_data_inspection._cli import snapshot_cases
+
+    empty, images = tmp_path / "empty", tmp_path / "images"
+    empty.mkdir()
+    images.mkdir()
+    for i in range(2):
+        np.save(images / f"case_{i}.npy", np.zeros((4, 5)))
+    layer = {"file_type": ".npy", "type": "Image", "backend": "numpy"}
+    config = {
+        "name": "project",
+        "layers": [
+            {**layer, "name": "missing", "path": str(empty)},
+            {**layer, "name": "img", "path": str(images)},
+        ],
+    }
+
+    cases = snapshot_cases(OmegaConf.create(config))
+    assert [(index, name) for index, name, _ in cases] == [(0, "case_0"), (1, "case_1")]
+    assert [name for name, *_ in cases[1][2]] == ["img"]
+    assert cases[1][2][0][1] == str(images / "case_1.npy")
@@ -0,0 +1,272 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("napari")
+
+from napari.components import ViewerModel  # noqa: E402
+from napari_toolkit.utils import get_value, set_value  # noqa: E402
+from napari_toolkit.widgets.buttons.tool_button import activate_option  # noqa: E402
+
+from napari_data_inspection import DataInspectionWidget  # noqa: E402
+from napari_data_inspection.widgets.layers_block_widget import AUTO_BACKEND  # noqa: E402
+
+
+def project_config(path, name="project"):
+    return {
+        "name": name,
+        "layers": [
+            {
+                "name": "img",
+                "path": str(path),
+                "file_type": ".npy",
+                "type": "Image",
+                "backend": "numpy",
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def cases(tmp_path):
+    for i in range(5):
+        np.save(tmp_path / f"case_{i}.npy", np.full((4, 5, 6), i, np.float32))
+    return tmp_path
+
+
+@pytest.fixture
+def widget(qtbot):
+    # a viewer model is enough for the widget and needs no OpenGL context
+    widget = DataInspectionWidget(ViewerModel())
+    qtbot.addWidget(widget)
+    return widget
+
+
+def load(widget, qtbot, config):
+    widget.load_config(config)
+    qtbot.waitUntil(
+        lambda: all(not lb.scanning and len(lb) for lb in widget.layer_blocks), timeout=5000
+    )
+
+
+def show(widget, qtbot, layer_blocks, index):
+    # cache misses are decoded on the workers and shown through a queued signal
+    widget.load_case(layer_blocks, index)
+    qtbot.waitUntil(lambda: not widget.loading, timeout=5000)
+
+
+def test_shuffle_config_roundtrip(widget, qtbot, cases):
+    load(widget, qtbot, project_config(cases))
+
+    set_value(widget.shuffle_seed_spbx, 7)
+    set_value(widget.shuffle_ckbx, True)
+    assert widget.shuffle_seed == 7
+    assert widget.case_order == list(np.random.default_rng(7).permutation(5))
+
+    config = widget.project_config()
+    assert config["data_inspection"]["shuffle"] is True
+    assert config["data_inspection"]["shuffle_seed"] == 7
+
+    widget.clear_project()
+    assert not get_value(widget.shuffle_ckbx)
+    assert widget.shuffle_seed is None
+
+    load(widget, qtbot, config)
+    assert get_value(widget.shuffle_ckbx)
+    assert get_value(widget.shuffle_seed_spbx) == 7
+    assert widget.shuffle_seed == 7
+    assert widget.case_order == list(np.random.default_rng(7).permutation(5))
+
+
+def test_auto_backend_is_opt_in(widget, cases):
+    layer_config = project_config(cases)["layers"][0]
+    del layer_config["backend"]
+    widget.add_layer({**layer_config, "file_type": ".nii.gz"})
+    layer_block = widget.layer_blocks[0]
+
+    default = layer_block.backend_options()[0]
+    assert default != AUTO_BACKEND
+    assert AUTO_BACKEND in layer_block.backend_options()
+    config = layer_block.get_config()
+    assert config["backend"] == default
+    assert "auto_backend" not in config
+
+    # before the benchmark finished the default backend is written, never "auto"
+    activate_option(layer_block.backend_btn, AUTO_BACKEND)
+    config = layer_block.get_config()
+    assert config["backend"] == default
+    assert config["auto_backend"]["backend"] is None
+
+    layer_block.auto_backend = layer_block.backend_options()[1]
+    config = layer_block.get_config()
+    assert config["backend"] == layer_block.backend_options()[1]
+    assert config["auto_backend"]["backend"] == config["backend"]
+
+
+def test_switch_from_3d_to_4d_case(widget, qtbot, tmp_path):
+    np.save(tmp_path / "case_0.npy", np.zeros((4, 5, 6), np.float32))
+    np.save(tmp_path / "case_1.npy", np.ones((3, 4, 5, 6), np.float32))
+    load(widget, qtbot, project_config(tmp_path))
+    layer_block = widget.layer_blocks[0]
+
+    show(widget, qtbot, [layer_block], 0)
+    layer = widget.viewer.layers[0]
+    assert widget.viewer.dims.ndim == 3
+
+    show(widget, qtbot, [layer_block], 1)
+    assert widget.viewer.layers[0] is layer
+    assert layer.data.shape == (3, 4, 5, 6)
+    assert layer.affine.affine_matrix.shape == (5, 5)
+    assert widget.viewer.dims.ndim == 4
+    assert [r.stop for r in widget.viewer.dims.range] == [2, 3, 4, 5]
+
+    show(widget, qtbot, [layer_block], 0)
+    assert widget.viewer.dims.ndim == 3
+    assert [r.stop for r in widget.viewer.dims.range] == [3, 4, 5]
+
+
+def test_idle_viewer_releases_cache_under_memory_pressure(widget, qtbot, cases, monkeypatch):
+    load(widget, qtbot, project_config(cases))
+    widget.load_case(widget.layer_blocks, 0)
+    widget.prefetch(0)
+    qtbot.waitUntil(lambda: "1" in widget.cache_data.get("img", {}), timeout=5000)
+
+    monkeypatch.setattr(widget, "_memory_pressure", lambda: 2)
+    widget.on_memory_timer()
+    assert widget.prefetch_radius == 0
+    assert widget.cache_data["img"] == {}
+    assert "prefetch paused" in widget.memory_label.text()
+
+    monkeypatch.setattr(widget, "_memory_pressure", lambda: 0)
+    widget.on_memory_timer()
+    assert widget.prefetch_radius == widget.cache_radius
+    qtbot.waitUntil(lambda: "1" in widget.cache_data.get("img", {}), timeout=5000)
+
+
+def test_image_and_labels_of_one_file_decode_separately(widget, qtbot, cases):
+    config = project_config(cases)
+    config["layers"].append({**config["layers"][0], "name": "seg", "type": "Labels"})
+    load(widget, qtbot, config)
+    image, labels = widget.layer_blocks
+    assert image.load_key(image[1]) != labels.load_key(labels[1])
+
+    qtbot.waitUntil(lambda: not widget._inflight._futures, timeout=5000)
+    widget.cache_data, widget.cache_meta = {}, {}
+    widget.stats_mode = True
+    widget.prefetch(0)
+    qtbot.waitUntil(
+        lambda: all("1" in widget.cache_data.get(n, {}) for n in ("img", "seg")), timeout=5000
+    )
+    # the image prefetch was submitted first, the labels still got their statistics
+    assert str(labels[1]) in widget.label_stats
+
+
+def test_roi_crop_is_computed_and_cached_by_the_workers(widget, qtbot, tmp_path, monkeypatch):
+    images, masks = tmp_path / "images", tmp_path / "masks"
+    images.mkdir()
+    masks.mkdir()
+    for i in range(3):
+        mask = np.zeros((10, 12, 14), np.uint8)
+        mask[2:4, 3:6, 4:8] = 1
+        np.save(images / f"case_{i}.npy", np.random.rand(10, 12, 14).astype(np.float32))
+        np.save(masks / f"case_{i}.npy", mask)
+    config = project_config(images)
+    config["layers"].append({**project_config(masks)["layers"][0], "name": "seg", "type": "Labels"})
+    load(widget, qtbot, config)
+
+    decoding_threads = []
+    decode = widget._decode
+
+    def _decode(*args):
+        decoding_threads.append(threading.current_thread())
+        return decode(*args)
+
+    monkeypatch.setattr(widget, "_decode", _decode)
+    set_value(widget.roi_margin, 1)
+    set_value(widget.roi_ckbx, True)
+    qtbot.waitUntil(lambda: all("1" in widget.cache_data.get(n, {}) for n in ("img", "seg")))
+
+    for name in ("img", "seg"):
+        assert widget.cache_data[name]["1"].shape == (4, 5, 6)
+        assert widget.cache_meta[name]["1"]["roi_offset"] == (1, 2, 3)
+    assert widget.viewer.layers[0].data.shape == (4, 5, 6)
+    assert decoding_threads
+    assert threading.main_thread() not in decoding_threads
+
+
+def test_filter_metadata_of_image_and_labels_of_one_file(widget, qtbot, tmp_path):
+    for i in range(3):
+        np.save(tmp_path / f"case_{i}.npy", np.full((4, 5, 6), i + 2, np.uint8))
+    config = project_config(tmp_path)
+    config["layers"].append({**config["layers"][0], "name": "seg", "type": "Labels"})
+    load(widget, qtbot, config)
+
+    def run_filter(expression):
+        with qtbot.waitSignal(widget.filter_finished, timeout=5000):
+            set_value(widget.filter_ledt, expression)
+            widget.on_filter_entered()
+        return widget.filter_label.text()
+
+    # the image metadata (min/max) is cached first, the labels still get their classes
+    assert run_filter("max_value >= 0") == "3 / 3 cases"
+    assert run_filter("3 in classes") == "1 / 3 cases"
+    assert widget.case_order == [1]
+
+
+def test_search_prefetches_the_few_matching_cases(widget, qtbot, cases, monkeypatch):
+    load(widget, qtbot, project_config(cases))
+    monkeypatch.setattr(widget, "_memory_pressure", lambda: 0)
+    qtbot.waitUntil(lambda: not widget._inflight._futures, timeout=5000)
+
+    # too many matches, nothing is loaded speculatively
+    set_value(widget.search_name, "case")
+    widget.on_search_changed()
+    assert widget.speculative_indices == set()
+
+    # the debounced search loads the match, it is outside of the prefetch radius
+    set_value(widget.search_name, "case_3")
+    qtbot.waitUntil(lambda: "3" in widget.cache_data.get("img", {}), timeout=5000)
+    assert widget.speculative_indices == {3}
+
+    decoded = []
+    decode = widget._decode
+    monkeypatch.setattr(widget, "_decode", lambda *args: decoded.append(args[1]) or decode(*args))
+    widget.on_name_entered()
+    qtbot.waitUntil(lambda: widget.viewer.layers[0].data[0, 0, 0] == 3, timeout=5000)
+    assert widget.current_index() == 3
+    # the search result came from the cache
+    assert str(cases / "case_3.npy") not in map(str, decoded)
+
+
+def test_navigation_does_not_wait_for_decoding_and_drops_skipped_steps(
+    widget, qtbot, cases, monkeypatch
+):
+    load(widget, qtbot, project_config(cases))
+    qtbot.waitUntil(lambda: not widget.loading and not widget._inflight._futures, timeout=5000)
+    set_value(widget.prefetch_prev, False)
+    set_value(widget.prefetch_next, False)
+    widget.cache_data, widget.cache_meta = {}, {}
+
+    release, decoded = threading.Event(), []
+    decode = widget._decode
+
+    def slow_decode(loader, file, labels):
+        release.wait(5)
+        decoded.append(file)
+        return decode(loader, file, labels)
+
+    monkeypatch.setattr(widget, "_decode", slow_decode)
+    layer = widget.viewer.layers[0]
+    set_value(widget.progressbar, 1)
+    # the GUI thread is free while case 1 decodes, the viewer still shows case 0
+    assert widget.loading
+    assert layer.data[0, 0, 0] == 0
+    # key repeat, only the latest step is loaded once case 1 is shown
+    for position in (2, 3, 4):
+        set_value(widget.progressbar, position)
+    release.set()
+
+    qtbot.waitUntil(lambda: not widget.loading and widget.index == 4, timeout=5000)
+    assert layer.data[0, 0, 0] == 4
+    assert [str(file) for file in decoded] == [str(cases / f"case_{i}.npy") for i in (1, 4)]